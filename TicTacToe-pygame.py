@@ -8,12 +8,20 @@ Features:
 - Player vs Computer (Hard - Minimax AI)
 - Click to place marks
 - Visual feedback and game state display
+- Bigger boards: python TicTacToe-pygame.py SIZE [K]
+  (e.g. 5 4 for 4 in a row on 5×5, 15 5 for gomoku; see nk_engine.py)
+- --profile (statistics on the screen) and --trace FILE, see profiling.py
 """
 
 import math
 import random
 import pygame
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from nk_engine import NKGame, SearchPlayer
+from profiling import NullProfiler, profiler_from_argv
+from text_cache import render_text
 
 # Initialize pygame
 pygame.init()
@@ -21,9 +29,13 @@ pygame.init()
 # Constants
 WINDOW_SIZE = 600
 GRID_SIZE = 3
+WIN_LENGTH = 3          # marks in a row needed to win
 CELL_SIZE = WINDOW_SIZE // GRID_SIZE
 LINE_WIDTH = 15
 MARK_WIDTH = 15
+SEARCH_TIME = 1.0       # seconds per move for the computer on bigger boards
+AI_DEADLINE = 10000     # milliseconds before a search is given up (random move instead);
+                        # the players' cancel() makes the abandoned search stop
 
 # Colors
 WHITE = (255, 255, 255)
@@ -90,6 +102,11 @@ class TicTacToe:
         
         return False
     
+    def undo_move(self, square):
+        """Take back the move on square"""
+        self.board[square] = ' '
+        self.current_winner = None
+    
     def reset(self):
         """Reset the board"""
         self.board = [' ' for _ in range(9)]
@@ -105,57 +122,225 @@ class ComputerPlayer:
         return random.choice(game.available_moves())
 
 
+# The 8 lines that win the game, and the lines through each square
+WIN_LINES = ((0, 1, 2), (3, 4, 5), (6, 7, 8),
+             (0, 3, 6), (1, 4, 7), (2, 5, 8),
+             (0, 4, 8), (2, 4, 6))
+LINES_THROUGH = tuple(tuple(line for line in WIN_LINES if square in line) for square in range(9))
+
+# The 8 rotations/reflections of the board: new_board[i] = board[perm[i]]
+_ROTATE = tuple((2 - i % 3) * 3 + i // 3 for i in range(9))
+_MIRROR = tuple((i // 3) * 3 + 2 - i % 3 for i in range(9))
+SYMMETRIES = []
+_perm = tuple(range(9))
+for _ in range(4):
+    SYMMETRIES.append(_perm)
+    SYMMETRIES.append(tuple(_perm[m] for m in _MIRROR))
+    _perm = tuple(_perm[r] for r in _ROTATE)
+SYMMETRIES = tuple(SYMMETRIES)
+
+# Kinds of values stored in the transposition table
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+# Bitboards: bit i is set if square i is taken
+FULL_BOARD = 0b111111111
+WIN_MASKS = tuple(sum(1 << square for square in line) for line in WIN_LINES)
+# Lookup tables for all 512 possible bitboards
+IS_WIN = tuple(any(bits & mask == mask for mask in WIN_MASKS) for bits in range(512))
+FREE_SQUARES = tuple(tuple(i for i in range(9) if not bits >> i & 1) for bits in range(512))
+
+
+class BitboardTicTacToe:
+    """Same game as TicTacToe, stored as two 9-bit integers (one per player)
+
+    Moves, undo and the win test are a few bit operations and table lookups.
+    `board` is still available as a list for drawing.
+    """
+    
+    def __init__(self):
+        self.x_bits = 0
+        self.o_bits = 0
+        self.current_winner = None
+    
+    @property
+    def board(self):
+        """The board as a list of ' ', 'X' and 'O'"""
+        return ['X' if self.x_bits >> i & 1 else 'O' if self.o_bits >> i & 1 else ' '
+                for i in range(9)]
+    
+    def available_moves(self):
+        """Return list of available positions"""
+        return list(FREE_SQUARES[self.x_bits | self.o_bits])
+    
+    def empty_squares(self):
+        """Check if there are empty squares"""
+        return self.x_bits | self.o_bits != FULL_BOARD
+    
+    def num_empty_squares(self):
+        """Count empty squares"""
+        return len(FREE_SQUARES[self.x_bits | self.o_bits])
+    
+    def make_move(self, square, letter):
+        """Make a move if valid"""
+        bit = 1 << square
+        if (self.x_bits | self.o_bits) & bit:
+            return False
+        if letter == 'X':
+            self.x_bits |= bit
+            won = IS_WIN[self.x_bits]
+        else:
+            self.o_bits |= bit
+            won = IS_WIN[self.o_bits]
+        if won:
+            self.current_winner = letter
+        return True
+    
+    def winner(self, square, letter):
+        """Check if letter has a complete line"""
+        return IS_WIN[self.x_bits if letter == 'X' else self.o_bits]
+    
+    def undo_move(self, square):
+        """Take back the move on square"""
+        keep = FULL_BOARD ^ (1 << square)
+        self.x_bits &= keep
+        self.o_bits &= keep
+        self.current_winner = None
+    
+    def reset(self):
+        """Reset the board"""
+        self.x_bits = 0
+        self.o_bits = 0
+        self.current_winner = None
+
+
+class _SearchCancelled(Exception):
+    """Raised inside MinimaxPlayer's search when cancel() was called"""
+
+
 class MinimaxPlayer:
+    # Positions already searched, shared by all MinimaxPlayers in this process.
+    # Key: smallest of the 8 symmetric board strings + player to move.
+    # Value: (score for the player to move, EXACT/LOWER_BOUND/UPPER_BOUND)
+    transposition_table = {}
+    # Best (position, score for the player to move) per exact board + player
+    best_moves = {}
+    
     def __init__(self, letter):
         self.letter = letter
+        self.cancelled = False
     
     def get_move(self, game):
         """Get best move using minimax algorithm"""
+        self.cancelled = False
         if len(game.available_moves()) == 9:
             # First move, choose random corner or center
             return random.choice([0, 2, 4, 6, 8])
-        else:
+        try:
             # Use minimax algorithm
             return self.minimax(game, self.letter)['position']
+        except _SearchCancelled:
+            # Nobody waits for this move any more
+            return random.choice(game.available_moves())
+    
+    def cancel(self):
+        """Stop a running get_move() soon (it then returns a random move)"""
+        self.cancelled = True
     
     def minimax(self, state, player):
-        """Minimax algorithm implementation"""
-        max_player = self.letter
+        """Minimax algorithm with alpha-beta pruning and a transposition table
+
+        Returns {'position': best move, 'score': score for self.letter}.
+        A win scores (empty squares + 1), so faster wins are preferred.
+        """
         other_player = 'O' if player == 'X' else 'X'
+        sign = 1 if player == self.letter else -1
+        board = list(state.board)
+        empty = board.count(' ')
         
         # Check if previous move was a winner
         if state.current_winner == other_player:
-            return {
-                'position': None,
-                'score': 1 * (state.num_empty_squares() + 1) if other_player == max_player else -1 * (state.num_empty_squares() + 1)
-            }
-        elif not state.empty_squares():
+            return {'position': None, 'score': -sign * (empty + 1)}
+        elif empty == 0:
             return {'position': None, 'score': 0}
         
-        if player == max_player:
-            best = {'position': None, 'score': -math.inf}
-        else:
-            best = {'position': None, 'score': math.inf}
+        key = ''.join(board) + player
+        if key in self.best_moves:
+            position, score = self.best_moves[key]
+            return {'position': position, 'score': sign * score}
         
-        for possible_move in state.available_moves():
-            # Try the move
-            state.make_move(possible_move, player)
-            # Simulate game after making that move
-            sim_score = self.minimax(state, other_player)
-            
-            # Undo the move
-            state.board[possible_move] = ' '
-            state.current_winner = None
-            sim_score['position'] = possible_move
-            
-            # Update best move
-            if player == max_player:
-                if sim_score['score'] > best['score']:
-                    best = sim_score
+        # Try every move; the first move with the best score wins ties
+        best = {'position': None, 'score': -math.inf}
+        alpha = -math.inf
+        for possible_move in range(9):
+            if board[possible_move] != ' ':
+                continue
+            board[possible_move] = player
+            if self._is_win(board, possible_move, player):
+                score = empty
+            elif empty == 1:
+                score = 0
             else:
-                if sim_score['score'] < best['score']:
-                    best = sim_score
+                score = -self._negamax(board, other_player, empty - 1, -math.inf, -alpha)
+            board[possible_move] = ' '
+            if score > best['score']:
+                best = {'position': possible_move, 'score': score}
+                alpha = score
         
+        self.best_moves[key] = (best['position'], best['score'])
+        best['score'] *= sign
+        return best
+    
+    @staticmethod
+    def _is_win(board, square, letter):
+        """Check if the last move on square completed a line"""
+        for a, b, c in LINES_THROUGH[square]:
+            if board[a] == letter and board[b] == letter and board[c] == letter:
+                return True
+        return False
+    
+    def _negamax(self, board, player, empty, alpha, beta):
+        """Score for player to move (the previous move did not end the game)"""
+        if self.cancelled:
+            raise _SearchCancelled()
+        table = self.transposition_table
+        key = min(''.join([board[i] for i in perm]) for perm in SYMMETRIES) + player
+        entry = table.get(key)
+        if entry is not None:
+            value, kind = entry
+            if kind == EXACT:
+                return value
+            if kind == LOWER_BOUND and value >= beta:
+                return value
+            if kind == UPPER_BOUND and value <= alpha:
+                return value
+        
+        other_player = 'O' if player == 'X' else 'X'
+        original_alpha = alpha
+        best = -math.inf
+        for possible_move in range(9):
+            if board[possible_move] != ' ':
+                continue
+            board[possible_move] = player
+            if self._is_win(board, possible_move, player):
+                score = empty
+            elif empty == 1:
+                score = 0
+            else:
+                score = -self._negamax(board, other_player, empty - 1, -beta, -alpha)
+            board[possible_move] = ' '
+            if score > best:
+                best = score
+                if best > alpha:
+                    alpha = best
+                    if alpha >= beta:
+                        break  # The opponent will never allow this position
+        
+        if best <= original_alpha:
+            table[key] = (best, UPPER_BOUND)
+        elif best >= beta:
+            table[key] = (best, LOWER_BOUND)
+        else:
+            table[key] = (best, EXACT)
         return best
 
 
@@ -176,31 +361,36 @@ def draw_marks(game):
     """Draw X's and O's on the board"""
     for i, mark in enumerate(game.board):
         if mark != ' ':
-            row = i // 3
-            col = i % 3
-            center_x = col * CELL_SIZE + CELL_SIZE // 2
-            center_y = row * CELL_SIZE + CELL_SIZE // 2
-            
-            if mark == 'X':
-                # Draw X
-                offset = CELL_SIZE // 3
-                pygame.draw.line(screen, BLUE, 
-                               (center_x - offset, center_y - offset),
-                               (center_x + offset, center_y + offset), MARK_WIDTH)
-                pygame.draw.line(screen, BLUE,
-                               (center_x + offset, center_y - offset),
-                               (center_x - offset, center_y + offset), MARK_WIDTH)
-            else:  # O
-                # Draw O
-                radius = CELL_SIZE // 3
-                pygame.draw.circle(screen, RED, (center_x, center_y), radius, MARK_WIDTH)
+            draw_mark(i, mark)
+
+
+def draw_mark(i, mark):
+    """Draw one X or O in cell i and return the cell's rectangle"""
+    row = i // GRID_SIZE
+    col = i % GRID_SIZE
+    center_x = col * CELL_SIZE + CELL_SIZE // 2
+    center_y = row * CELL_SIZE + CELL_SIZE // 2
+    
+    if mark == 'X':
+        # Draw X
+        offset = CELL_SIZE // 3
+        pygame.draw.line(screen, BLUE, 
+                       (center_x - offset, center_y - offset),
+                       (center_x + offset, center_y + offset), MARK_WIDTH)
+        pygame.draw.line(screen, BLUE,
+                       (center_x + offset, center_y - offset),
+                       (center_x - offset, center_y + offset), MARK_WIDTH)
+    else:  # O
+        # Draw O
+        radius = CELL_SIZE // 3
+        pygame.draw.circle(screen, RED, (center_x, center_y), radius, MARK_WIDTH)
+    return pygame.Rect(col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE)
 
 
 def draw_status(text, color=BLACK):
     """Draw status text at the bottom"""
     pygame.draw.rect(screen, LIGHT_BLUE, (0, WINDOW_SIZE, WINDOW_SIZE, 100))
-    font = pygame.font.Font(None, 48)
-    text_surface = font.render(text, True, color)
+    text_surface = render_text(text, 48, color)
     text_rect = text_surface.get_rect(center=(WINDOW_SIZE // 2, WINDOW_SIZE + 50))
     screen.blit(text_surface, text_rect)
 
@@ -209,8 +399,7 @@ def draw_button(text, rect, color):
     """Draw a button"""
     pygame.draw.rect(screen, color, rect)
     pygame.draw.rect(screen, BLACK, rect, 3)
-    font = pygame.font.Font(None, 36)
-    text_surface = font.render(text, True, BLACK)
+    text_surface = render_text(text, 36, BLACK)
     text_rect = text_surface.get_rect(center=rect.center)
     screen.blit(text_surface, text_rect)
 
@@ -229,24 +418,30 @@ def show_menu():
     hard_button = pygame.Rect(button_x, 350, button_width, button_height)
     quit_button = pygame.Rect(button_x, 450, button_width, button_height)
     
+    needs_redraw = True
     while menu_running:
-        screen.fill(WHITE)
-        
-        # Title
-        title_font = pygame.font.Font(None, 72)
-        title = title_font.render("TIC TAC TOE", True, BLACK)
-        screen.blit(title, (WINDOW_SIZE // 2 - title.get_width() // 2, 50))
-        
-        # Draw buttons
-        draw_button("Player vs Player", pvp_button, GREEN)
-        draw_button("vs Computer (Easy)", easy_button, BLUE)
-        draw_button("vs Computer (Hard)", hard_button, RED)
-        draw_button("Quit", quit_button, GRAY)
-        
-        pygame.display.flip()
+        # The menu never changes by itself: draw it only when needed
+        if needs_redraw:
+            screen.fill(WHITE)
+            
+            # Title
+            title = render_text("TIC TAC TOE", 72, BLACK)
+            screen.blit(title, (WINDOW_SIZE // 2 - title.get_width() // 2, 50))
+            
+            # Draw buttons
+            draw_button("Player vs Player", pvp_button, GREEN)
+            draw_button("vs Computer (Easy)", easy_button, BLUE)
+            draw_button("vs Computer (Hard)", hard_button, RED)
+            draw_button("Quit", quit_button, GRAY)
+            
+            pygame.display.flip()
+            needs_redraw = False
         
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+        # Sleep until something happens instead of redrawing in a busy loop
+        for event in [pygame.event.wait()] + pygame.event.get():
+            if event.type == pygame.WINDOWEXPOSED:
+                needs_redraw = True
+            elif event.type == pygame.QUIT:
                 return None
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if pvp_button.collidepoint(event.pos):
@@ -266,14 +461,47 @@ def get_cell_from_mouse(pos):
     x, y = pos
     if y >= WINDOW_SIZE:  # Clicked in status area
         return None
-    col = x // CELL_SIZE
-    row = y // CELL_SIZE
-    return row * 3 + col
+    # min(): with e.g. 7 cells the last pixels of the window are past the grid
+    col = min(x // CELL_SIZE, GRID_SIZE - 1)
+    row = min(y // CELL_SIZE, GRID_SIZE - 1)
+    return row * GRID_SIZE + col
+
+
+# The computer thinks on this thread, so the window keeps reacting meanwhile
+AI_WORKER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tictactoe-ai")
 
 
-def play_game(game_mode):
-    """Main game loop"""
-    game = TicTacToe()
+def cancel_move(player, pending_move):
+    """Stop waiting for a computer move (and stop the search if the player can)"""
+    pending_move.cancel()
+    if hasattr(player, 'cancel'):
+        player.cancel()
+
+
+def play_game(game_mode, fps=60, ai_delay=500, profiler=None, wait_for_events=True,
+              executor=None, draw=True):
+    """Main game loop
+
+    Only changed cells and the status bar are redrawn and updated on screen
+    (everything, every frame, while the profiler overlay is shown).
+    While nothing changes the loop sleeps in pygame.event.wait().
+    The caller calls profiler.finish() once it stops playing.
+
+    fps: frame rate limit (0 = as fast as possible)
+    ai_delay: minimum milliseconds before the computer's move is shown
+    profiler: optional profiling.FrameProfiler that times each part of the loop
+    wait_for_events: False = never sleep (for scripted benchmark input)
+    executor: where the computer's search runs (default AI_WORKER); an
+        inline_executor.RunNow makes the moves independent of timing
+    draw: False = skip drawing and showing frames (fast-forward of a replay)
+    """
+    if profiler is None:
+        profiler = NullProfiler()
+    if executor is None:
+        executor = AI_WORKER
+    
+    classic = GRID_SIZE == 3 and WIN_LENGTH == 3
+    game = TicTacToe() if classic else NKGame(GRID_SIZE, WIN_LENGTH)
     current_player = 'X'
     
     # Set up players
@@ -283,66 +511,128 @@ def play_game(game_mode):
     elif game_mode == "easy":
         o_player = ComputerPlayer('O')
         status_text = "Your Turn (X)"
-    else:  # hard
+    elif classic:  # hard
         o_player = MinimaxPlayer('O')
         status_text = "Your Turn (X)"
+    else:  # hard, board too big for full minimax
+        o_player = SearchPlayer('O', time_budget=SEARCH_TIME)
+        status_text = "Your Turn (X)"
     
     game_over = False
     clock = pygame.time.Clock()
+    pending_move = None     # Future with the computer's move while it thinks
+    think_start = 0
+    
+    # What is on screen right now, to find out what has to be redrawn
+    full_redraw = True
+    shown_board = None
+    shown_status = None
+    status_area = pygame.Rect(0, WINDOW_SIZE, WINDOW_SIZE, 100)
     
     running = True
-    while running:
-        # Draw board
-        draw_grid()
-        draw_marks(game)
-        
-        if game_over:
-            if game.current_winner:
-                winner_text = f"{game.current_winner} Wins!"
-                color = BLUE if game.current_winner == 'X' else RED
-                draw_status(winner_text, color)
-            else:
-                draw_status("It's a Tie!", GREEN)
+    while running and profiler.next_frame():
+        changed = []    # rectangles of the screen that were redrawn
+        if draw:
+            with profiler.section("draw"):
+                # The profiler overlay changes every frame: redraw all below it
+                if full_redraw or profiler.show_overlay:
+                    # Draw board
+                    draw_grid()
+                    draw_marks(game)
+                    changed.append(screen.get_rect())
+                    shown_board = list(game.board)
+                    shown_status = None
+                    full_redraw = False
+                else:
+                    # Draw only the marks placed since the last frame
+                    for i, mark in enumerate(game.board):
+                        if mark != shown_board[i]:
+                            changed.append(draw_mark(i, mark))
+                            shown_board[i] = mark
+                
+                status = (game_over, game.current_winner, status_text)
+                if status != shown_status:
+                    if game_over:
+                        if game.current_winner:
+                            winner_text = f"{game.current_winner} Wins!"
+                            color = BLUE if game.current_winner == 'X' else RED
+                            draw_status(winner_text, color)
+                        else:
+                            draw_status("It's a Tie!", GREEN)
+                        
+                        # Draw restart button
+                        restart_button = pygame.Rect(150, WINDOW_SIZE + 20, 150, 60)
+                        menu_button = pygame.Rect(320, WINDOW_SIZE + 20, 150, 60)
+                        draw_button("Restart", restart_button, GREEN)
+                        draw_button("Menu", menu_button, GRAY)
+                    else:
+                        draw_status(status_text)
+                    changed.append(status_area)
+                    shown_status = status
             
-            # Draw restart button
-            restart_button = pygame.Rect(150, WINDOW_SIZE + 20, 150, 60)
-            menu_button = pygame.Rect(320, WINDOW_SIZE + 20, 150, 60)
-            draw_button("Restart", restart_button, GREEN)
-            draw_button("Menu", menu_button, GRAY)
-        else:
-            draw_status(status_text)
-        
-        pygame.display.flip()
+            profiler.overlay(screen)
+            with profiler.section("flip"):
+                if changed:
+                    pygame.display.update(changed)
         
         # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return False  # Exit game
-            elif event.type == pygame.MOUSEBUTTONDOWN and not game_over:
-                if current_player == 'X':
-                    cell = get_cell_from_mouse(event.pos)
-                    if cell is not None and game.make_move(cell, 'X'):
-                        if game.current_winner:
-                            game_over = True
-                        elif not game.empty_squares():
-                            game_over = True
-                        else:
-                            current_player = 'O'
-                            status_text = "Player O's Turn" if game_mode == "pvp" else "Computer's Turn"
-            elif event.type == pygame.MOUSEBUTTONDOWN and game_over:
-                # Check restart/menu buttons
-                restart_button = pygame.Rect(150, WINDOW_SIZE + 20, 150, 60)
-                menu_button = pygame.Rect(320, WINDOW_SIZE + 20, 150, 60)
-                if restart_button.collidepoint(event.pos):
-                    return True  # Restart
-                elif menu_button.collidepoint(event.pos):
-                    return "menu"  # Go to menu
+        with profiler.section("events"):
+            events = pygame.event.get()
+            if not events and not changed and wait_for_events:
+                # Nothing to do: sleep until the next event. While the computer
+                # thinks, wake up regularly to check for its move.
+                events = [pygame.event.wait(50 if pending_move is not None else 0)]
+            for event in events:
+                if event.type == pygame.WINDOWEXPOSED:
+                    full_redraw = True
+                elif event.type == pygame.QUIT:
+                    if pending_move is not None:
+                        cancel_move(o_player, pending_move)
+                    return False  # Exit game
+                elif event.type == pygame.MOUSEBUTTONDOWN and not game_over:
+                    if current_player == 'X':
+                        cell = get_cell_from_mouse(event.pos)
+                        if cell is not None and game.make_move(cell, 'X'):
+                            if game.current_winner:
+                                game_over = True
+                            elif not game.empty_squares():
+                                game_over = True
+                            else:
+                                current_player = 'O'
+                                status_text = "Player O's Turn" if game_mode == "pvp" else "Computer's Turn"
+                elif event.type == pygame.MOUSEBUTTONDOWN and game_over:
+                    # Check restart/menu buttons
+                    restart_button = pygame.Rect(150, WINDOW_SIZE + 20, 150, 60)
+                    menu_button = pygame.Rect(320, WINDOW_SIZE + 20, 150, 60)
+                    if restart_button.collidepoint(event.pos):
+                        return True  # Restart
+                    elif menu_button.collidepoint(event.pos):
+                        return "menu"  # Go to menu
         
-        # Computer's turn
+        # Computer's turn: the search runs on the executor while this loop keeps drawing
+        move = None
         if not game_over and current_player == 'O' and o_player is not None:
-            pygame.time.wait(500)  # Brief pause for better UX
-            move = o_player.get_move(game)
-            game.make_move(move, 'O')
+            if pending_move is None:
+                pending_move = executor.submit(o_player.get_move, game)
+                think_start = pygame.time.get_ticks()
+            waited = pygame.time.get_ticks() - think_start
+            if waited > AI_DEADLINE:
+                # Took too long: give up and play a random move
+                cancel_move(o_player, pending_move)
+                move = random.choice(game.available_moves())
+            elif pending_move.done() and waited >= ai_delay:  # Brief pause for better UX
+                move = pending_move.result()
+            else:
+                status_text = "Computer is thinking" + "." * (waited // 300 % 4)
+        
+        if move is not None:
+            pending_move = None
+            with profiler.section("update"):
+                game.make_move(move, 'O')
+            stats = getattr(o_player, 'stats', None)
+            if stats:
+                pygame.display.set_caption(f"Tic Tac Toe - depth {stats['depth']}, "
+                                           f"{stats['nodes_per_sec']} nodes/s")
             if game.current_winner:
                 game_over = True
             elif not game.empty_squares():
@@ -351,13 +641,29 @@ def play_game(game_mode):
                 current_player = 'X'
                 status_text = "Your Turn (X)" if game_mode != "pvp" else "Player X's Turn"
         
-        clock.tick(60)
+        clock.tick(fps)
     
     return False
 
 
+def configure_board(size, win_length):
+    """Switch to a size×size board where win_length marks in a row win"""
+    global GRID_SIZE, WIN_LENGTH, CELL_SIZE, LINE_WIDTH, MARK_WIDTH
+    GRID_SIZE = size
+    WIN_LENGTH = win_length
+    CELL_SIZE = WINDOW_SIZE // size
+    LINE_WIDTH = max(2, 45 // size)
+    MARK_WIDTH = max(2, 45 // size)
+
+
 def main():
     """Main function"""
+    numbers = [int(arg) for arg in sys.argv[1:] if arg.isdigit()]
+    if numbers:
+        size = numbers[0]
+        configure_board(size, numbers[1] if len(numbers) > 1 else min(size, 5))
+    profiler = profiler_from_argv(sys.argv)
+    
     running = True
     
     while running:
@@ -366,7 +672,7 @@ def main():
         if game_mode is None:
             break
         
-        result = play_game(game_mode)
+        result = play_game(game_mode, profiler=profiler)
         
         if result == False:  # Quit
             break
@@ -375,6 +681,7 @@ def main():
         elif result == "menu":  # Back to menu
             continue
     
+    profiler.finish()
     pygame.quit()
     sys.exit()
 
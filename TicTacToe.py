@@ -1,10 +1,18 @@
 # tictactoe.py
 # Übersetzung der gegebenen Java-Implementierung in Python
 
+from collections import OrderedDict
+
 UNBELEGT = 0
 minimumX = 0
 minimumY = 0
 
+# True: minwo_schnell() mit Cache statt minwo() für den Computerzug
+SCHNELLER_SOLVER = True
+# Höchstens so viele Stellungen im Cache (die am längsten unbenutzte fliegt raus)
+CACHE_GROESSE = 20000
+cache = OrderedDict()
+
 # 1 ist der menschliche Spieler
 # 2 ist der Computer
 feld = [
@@ -113,6 +121,86 @@ def minwo():
                 feld[x][y] = 0
     return minimalWert
 
+def kodierung():
+    """Packt das Feld in eine Zahl: 2 Bit pro Feld, Feld (x, y) an Bit 2 * (3 * x + y)"""
+    code = 0
+    for x in range(3):
+        for y in range(3):
+            code |= feld[x][y] << (2 * (3 * x + y))
+    return code
+
+def gewinnt(x, y, spieler):
+    """Prüft nur die Linien durch (x, y): hat spieler mit dem Zug dorthin gewonnen?"""
+    if feld[x][0] == spieler and feld[x][1] == spieler and feld[x][2] == spieler:
+        return True
+    if feld[0][y] == spieler and feld[1][y] == spieler and feld[2][y] == spieler:
+        return True
+    if x == y and feld[0][0] == spieler and feld[1][1] == spieler and feld[2][2] == spieler:
+        return True
+    if x + y == 2 and feld[0][2] == spieler and feld[1][1] == spieler and feld[2][0] == spieler:
+        return True
+    return False
+
+def wert_schnell(code, frei, mensch_am_zug):
+    """
+    Wie max_value (mensch_am_zug=True) bzw. min_value, aber:
+    - bekannte Stellungen kommen aus dem Cache (Schlüssel: code und wer am Zug ist)
+    - nach jedem Zug werden nur die Linien durch das neue Feld geprüft
+    code ist kodierung() des aktuellen Feldes, frei die Zahl der freien Felder.
+    """
+    schluessel = code * 2 + mensch_am_zug
+    if schluessel in cache:
+        cache.move_to_end(schluessel)
+        return cache[schluessel]
+
+    spieler = 1 if mensch_am_zug else 2
+    bester = -999.0 if mensch_am_zug else 999.0
+    for x in range(3):
+        for y in range(3):
+            if feld[x][y] == 0:
+                feld[x][y] = spieler
+                if gewinnt(x, y, spieler):
+                    wert = 2.0 if spieler == 1 else 0.0
+                elif frei == 1:
+                    wert = 1.0
+                else:
+                    wert = wert_schnell(code | spieler << (2 * (3 * x + y)), frei - 1, not mensch_am_zug)
+                feld[x][y] = 0
+                if mensch_am_zug and wert > bester or not mensch_am_zug and wert < bester:
+                    bester = wert
+
+    cache[schluessel] = bester
+    if len(cache) > CACHE_GROESSE:
+        cache.popitem(last=False)
+    return bester
+
+def minwo_schnell():
+    """Wie minwo (gleiche Rückgabewerte und gleicher Zug), aber mit wert_schnell."""
+    global minimumX, minimumY
+    ev = auswertung()
+    if ev != -1:
+        return float(ev)
+
+    code = kodierung()
+    frei = sum(zeile.count(0) for zeile in feld)
+    minimalWert = 999.0
+    for x in range(3):
+        for y in range(3):
+            if feld[x][y] == 0:
+                feld[x][y] = 2
+                if gewinnt(x, y, 2):
+                    wert = 0.0
+                elif frei == 1:
+                    wert = 1.0
+                else:
+                    wert = wert_schnell(code | 2 << (2 * (3 * x + y)), frei - 1, True)
+                feld[x][y] = 0
+                if wert < minimalWert:
+                    minimalWert = wert
+                    minimumX = x
+                    minimumY = y
+    return minimalWert
+
 def spielen():
     global minimumX, minimumY
     while auswertung() == -1:
@@ -149,7 +237,10 @@ def spielen():
         if auswertung() != -1:
             break  # Spiel vorbei nach dem Zug des Menschen
 
-        minwo()
+        if SCHNELLER_SOLVER:
+            minwo_schnell()
+        else:
+            minwo()
         # falls minimumX/Y eine gültige Position sind
         feld[minimumX][minimumY] = 2
         print(f"Computer zieht: {minimumX+1}, {minimumY+1}")
@@ -0,0 +1,215 @@
+"""
+Ball System: Vectorized Physics for Demo 5
+==========================================
+Instead of one Python object per ball, BallSystem keeps all balls in a few
+NumPy arrays (struct of arrays). Moving, bouncing and colliding thousands
+of balls is then a handful of array operations per frame.
+
+The rules are the same as in demo5_classes.Ball:
+- each step every ball moves by (speed_x, speed_y) × dt
+- a ball outside the walls reverses that speed component
+- overlapping balls that move towards each other exchange velocity along
+  the line between their centers and are pushed apart by half the overlap
+
+The only difference is that all contacts of one frame are resolved at the
+same time from the same positions, instead of one pair after the other.
+"""
+
+import numpy as np
+import pygame
+
+WIDTH = 800
+HEIGHT = 600
+
+# Same choices as demo5_classes.Ball
+MIN_RADIUS = 15
+MAX_RADIUS = 40
+SPEEDS = np.array([-3, -2, 2, 3], dtype=np.float64)
+
+
+class BallSystem:
+    """All balls of the demo stored in contiguous NumPy arrays"""
+
+    def __init__(self, capacity=1024, width=WIDTH, height=HEIGHT, seed=None):
+        self.width = width
+        self.height = height
+        self.rng = np.random.default_rng(seed)
+        self.count = 0
+        self.x = self._new_array(capacity)
+        self.y = self._new_array(capacity)
+        self.prev_x = self._new_array(capacity)     # positions before the last move
+        self.prev_y = self._new_array(capacity)
+        self.vx = self._new_array(capacity)
+        self.vy = self._new_array(capacity)
+        self.radius = self._new_array(capacity)
+        self.color = self._new_array((capacity, 3), np.uint8)
+
+    def _new_array(self, shape, dtype=np.float64):
+        """A zeroed array for one column (ParallelBallSystem puts it in shared memory)"""
+        return np.zeros(shape, dtype=dtype)
+
+    def __len__(self):
+        return self.count
+
+    def _reserve(self, extra):
+        """Grow the arrays (doubling) so that `extra` more balls fit"""
+        needed = self.count + extra
+        capacity = len(self.x)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ('x', 'y', 'prev_x', 'prev_y', 'vx', 'vy', 'radius', 'color'):
+            old = getattr(self, name)
+            new = self._new_array((capacity,) + old.shape[1:], old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, x, y, count=1):
+        """Add `count` random balls at position (x, y), like Ball(x, y)"""
+        self._reserve(count)
+        s = slice(self.count, self.count + count)
+        self.x[s] = self.prev_x[s] = x
+        self.y[s] = self.prev_y[s] = y
+        self.radius[s] = self.rng.integers(MIN_RADIUS, MAX_RADIUS + 1, count)
+        self.color[s] = self.rng.integers(0, 256, (count, 3))
+        self.vx[s] = self.rng.choice(SPEEDS, count)
+        self.vy[s] = self.rng.choice(SPEEDS, count)
+        self.count += count
+
+    def add_ball(self, ball):
+        """Copy an existing demo5_classes.Ball into the system"""
+        self._reserve(1)
+        i = self.count
+        self.x[i] = ball.x
+        self.y[i] = ball.y
+        self.prev_x[i] = ball.prev_x
+        self.prev_y[i] = ball.prev_y
+        self.vx[i] = ball.speed_x
+        self.vy[i] = ball.speed_y
+        self.radius[i] = ball.radius
+        self.color[i] = ball.color
+        self.count += 1
+
+    def move(self, dt=1.0):
+        """Move all balls and bounce them off the walls (dt 1.0 = 1/60 s)"""
+        n = self.count
+        x, y, r = self.x[:n], self.y[:n], self.radius[:n]
+        vx, vy = self.vx[:n], self.vy[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        x += vx * dt
+        y += vy * dt
+        vx[(x < r) | (x > self.width - r)] *= -1
+        vy[(y < r) | (y > self.height - r)] *= -1
+
+    def candidate_pairs(self):
+        """Return index arrays (i, j) of balls in the same or neighbouring grid cells"""
+        n = self.count
+        return grid_pairs(self.x[:n], self.y[:n], self.radius[:n])
+
+    def collide(self):
+        """Resolve all overlapping pairs with the Ball.handle_collision rule"""
+        n = self.count
+        i, j = self.candidate_pairs()
+        i, j, dvx, dvy, dx, dy = contacts(self.x, self.y, self.vx, self.vy, self.radius, i, j)
+        if len(i) == 0:
+            return 0
+        # Exchange velocities along the collision axis, separate balls to prevent overlap
+        self.vx[:n] += np.bincount(j, dvx, n) - np.bincount(i, dvx, n)
+        self.vy[:n] += np.bincount(j, dvy, n) - np.bincount(i, dvy, n)
+        self.x[:n] += np.bincount(j, dx, n) - np.bincount(i, dx, n)
+        self.y[:n] += np.bincount(j, dy, n) - np.bincount(i, dy, n)
+        return len(i)
+
+    def step(self, dt=1.0):
+        """Advance the simulation by one step"""
+        self.move(dt)
+        self.collide()
+
+    def close(self):
+        """Free what the system holds besides its arrays (nothing here)"""
+
+    def draw(self, surface, alpha=1.0):
+        """Draw all balls
+
+        alpha: draw between the previous (0.0) and current (1.0) positions
+        """
+        n = self.count
+        prev_x, prev_y = self.prev_x[:n], self.prev_y[:n]
+        xs = (prev_x + (self.x[:n] - prev_x) * alpha).astype(int).tolist()
+        ys = (prev_y + (self.y[:n] - prev_y) * alpha).astype(int).tolist()
+        radii = self.radius[:n].astype(int).tolist()
+        colors = [tuple(color) for color in self.color[:n].tolist()]
+        circle = pygame.draw.circle
+        for color, x, y, radius in zip(colors, xs, ys, radii):
+            circle(surface, color, (x, y), radius)
+
+
+def grid_pairs(x, y, radius):
+    """Return index arrays (i, j) of balls in the same or neighbouring grid cells"""
+    n = len(x)
+    if n < 2:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+
+    # Cells as wide as the largest ball, with an empty border column so
+    # that the neighbour of the first column never wraps to another row
+    cell_size = 2 * radius.max()
+    cx = np.floor(x / cell_size).astype(np.intp)
+    cy = np.floor(y / cell_size).astype(np.intp)
+    cx -= cx.min() - 1
+    cy -= cy.min()
+    columns = cx.max() + 2
+    key = cy * columns + cx
+
+    order = np.argsort(key, kind='stable')
+    sorted_key = key[order]
+
+    pairs_i = []
+    pairs_j = []
+    position = np.arange(n)
+    # Same cell, then half of the neighbours so every pair appears once
+    for dx, dy in ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1)):
+        neighbour = sorted_key + dy * columns + dx
+        start = np.searchsorted(sorted_key, neighbour, side='left')
+        end = np.searchsorted(sorted_key, neighbour, side='right')
+        if dx == 0 and dy == 0:
+            start = position + 1
+        counts = end - start
+        total = counts.sum()
+        if total == 0:
+            continue
+        first = np.cumsum(counts) - counts
+        j = np.arange(total) - np.repeat(first - start, counts)
+        pairs_i.append(np.repeat(position, counts))
+        pairs_j.append(j)
+
+    if not pairs_i:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+    return order[np.concatenate(pairs_i)], order[np.concatenate(pairs_j)]
+
+
+def contacts(x, y, vx, vy, radius, i, j):
+    """Keep the pairs (i, j) that overlap and move towards each other.
+
+    Returns (i, j, dvx, dvy, dx, dy): ball j gains (dvx, dvy) of speed and
+    moves by (dx, dy), ball i loses the same (Ball.handle_collision).
+    """
+    dx = x[j] - x[i]
+    dy = y[j] - y[i]
+    distance = np.sqrt(dx * dx + dy * dy)
+    touching = (distance < radius[i] + radius[j]) & (distance > 0)
+
+    # Normalize direction and keep only pairs moving towards each other
+    i, j, distance = i[touching], j[touching], distance[touching]
+    dx = dx[touching] / distance
+    dy = dy[touching] / distance
+    dot = (vx[i] - vx[j]) * dx + (vy[i] - vy[j]) * dy
+    approaching = dot > 0
+    i, j, distance = i[approaching], j[approaching], distance[approaching]
+    dx, dy, dot = dx[approaching], dy[approaching], dot[approaching]
+
+    push = (radius[i] + radius[j] - distance) * 0.5
+    return i, j, dot * dx, dot * dy, push * dx, push * dy
@@ -0,0 +1,672 @@
+"""
+Benchmark: Headless, Repeatable Demo Runs
+=========================================
+Runs the pygame demos without a window (SDL's dummy video driver), with a
+fixed random seed and scripted input, as fast as possible (no clock.tick
+limit). Prints frames per second, the time of each part of the game loop
+(events/update/collide/draw/flip) and the peak memory as JSON.
+
+Run it:
+    python benchmark.py                          # all scenarios
+    python benchmark.py demo5 flappy --frames 600
+    python benchmark.py demo5 --output baseline.json
+    python benchmark.py demo5 --trace trace.json  # every frame for chrome://tracing
+    python benchmark.py --micro tictactoe-board  # one piece of code only
+    python benchmark.py --micro entity-memory    # bytes per ball/bird/pipe
+    python benchmark.py --micro flappy-env       # headless Flappy Bird steps per minute
+    python benchmark.py --micro flappy-hud       # checks the HUD creates no surfaces per frame
+    python benchmark.py --micro swept-collisions # fast, dense balls: overlap vs. swept collisions
+    python benchmark.py --micro parallel-balls   # collisions of 50k balls on 1, 2, 4, ... cores
+    python benchmark.py --micro sleeping-balls   # settled balls with and without sleeping
+    python benchmark.py --micro vector-minimax   # whole game solved ply by ply with NumPy
+    python benchmark.py --micro mcts             # MCTS playouts/s and tree size per budget and core count
+
+Every scenario runs in its own process so that peak memory is per scenario.
+"""
+
+import os
+
+# Must be set before pygame is imported anywhere
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import pygame
+
+from fixed_timestep import FixedTimestep, FrameClock
+from inline_executor import RunNow
+from json_output import write_json
+from profiling import FrameProfiler
+from text_cache import cache_stats
+from tictactoe_loader import load_tictactoe
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def click(pos):
+    """A left mouse click at pos"""
+    return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1)
+
+
+def key(key_code):
+    """A key press"""
+    return pygame.event.Event(pygame.KEYDOWN, key=key_code, mod=0, unicode='', scancode=0)
+
+
+class ScriptedProfiler(FrameProfiler):
+    """FrameProfiler that posts scripted input events at the start of frames"""
+
+    def __init__(self, max_frames, script):
+        super().__init__(max_frames)
+        self.script = script  # {frame number (from 0): [events]}
+
+    def next_frame(self):
+        running = super().next_frame()
+        if running:
+            for event in self.script.get(self.frame_count - 1, ()):
+                pygame.event.post(event)
+        return running
+
+
+# --- Scenarios: input script + how to start the demo ---
+
+def demo5_clicks(rng):
+    """Click 20 times, every 10 frames, at random positions"""
+    return {1 + 10 * i: [click((rng.randint(50, 750), rng.randint(50, 550)))] for i in range(20)}
+
+
+def demo5_all_pairs_clicks(rng):
+    """Same clicks, but switch to all-pairs collisions first (G key)"""
+    script = demo5_clicks(rng)
+    script[0] = [key(pygame.K_g)]
+    return script
+
+
+def demo5_swept_clicks(rng):
+    """Same clicks, but with swept collisions (C key)"""
+    script = demo5_clicks(rng)
+    script[0] = [key(pygame.K_c)]
+    return script
+
+
+def flappy_flaps(rng):
+    """Flap every 18 frames (also restarts after a game over)"""
+    return {i: [key(pygame.K_SPACE)] for i in range(0, 100000, 18)}
+
+
+def tictactoe_clicks(rng):
+    """Click a random cell every 5 frames and the Restart button every 50 frames"""
+    script = {}
+    for i in range(0, 100000, 5):
+        if i % 50 == 45:
+            script[i] = [click((225, 650))]
+        else:
+            script[i] = [click((rng.randint(0, 599), rng.randint(0, 599)))]
+    return script
+
+
+def frame_timestep(step_hz):
+    """Fixed timestep that sees exactly 1/60 s pass per frame, however fast the run is"""
+    return FixedTimestep(step_hz, clock=FrameClock(60))
+
+
+def run_demo5(profiler):
+    import demo5_classes
+    demo5_classes.main(fps=0, profiler=profiler,
+                       timestep=frame_timestep(demo5_classes.STEP_HZ))
+
+
+def run_demo5_numpy(profiler):
+    import demo5_classes
+    demo5_classes.main(use_numpy=True, fps=0, profiler=profiler,
+                       timestep=frame_timestep(demo5_classes.STEP_HZ))
+
+
+def run_flappy(profiler):
+    import demo6_flappy_bird
+    demo6_flappy_bird.main(fps=0, profiler=profiler,
+                           timestep=frame_timestep(demo6_flappy_bird.STEP_HZ))
+
+
+def run_tictactoe(profiler):
+    tictactoe = load_tictactoe()
+    # The search runs inline (RunNow): on a thread, its moves would depend on timing.
+    # play_game returns True for "Restart" and False once the profiler stops
+    while tictactoe.play_game("hard", fps=0, ai_delay=0, profiler=profiler,
+                              wait_for_events=False, executor=RunNow()) is True:
+        pass
+    profiler.finish()
+
+
+SCENARIOS = {
+    'demo5': (run_demo5, demo5_clicks),
+    'demo5-allpairs': (run_demo5, demo5_all_pairs_clicks),
+    'demo5-swept': (run_demo5, demo5_swept_clicks),
+    'demo5-numpy': (run_demo5_numpy, demo5_clicks),
+    'flappy': (run_flappy, flappy_flaps),
+    'tictactoe': (run_tictactoe, tictactoe_clicks),
+}
+
+
+# --- Micro-benchmarks: one piece of code, no window ---
+
+def full_tree_search(game, player):
+    """Plain minimax over the whole game tree using only the public game API.
+
+    Returns (score for X, number of positions visited).
+    """
+    nodes = 1
+    if game.current_winner:
+        return (1 if game.current_winner == 'X' else -1), nodes
+    if not game.empty_squares():
+        return 0, nodes
+    other = 'O' if player == 'X' else 'X'
+    best = None
+    for move in game.available_moves():
+        game.make_move(move, player)
+        score, child_nodes = full_tree_search(game, other)
+        game.undo_move(move)
+        nodes += child_nodes
+        if best is None or (score > best if player == 'X' else score < best):
+            best = score
+    return best, nodes
+
+
+def micro_tictactoe_board():
+    """Full game tree search on the list board vs. the bitboard"""
+    tictactoe = load_tictactoe()
+    results = {}
+    for board_class in (tictactoe.TicTacToe, tictactoe.BitboardTicTacToe):
+        start = time.perf_counter()
+        score, nodes = full_tree_search(board_class(), 'X')
+        seconds = time.perf_counter() - start
+        results[board_class.__name__] = {
+            'score': score,
+            'nodes': nodes,
+            'seconds': round(seconds, 4),
+            'nodes_per_sec': round(nodes / seconds),
+        }
+    results['speedup'] = round(results['TicTacToe']['seconds']
+                               / results['BitboardTicTacToe']['seconds'], 2)
+    return results
+
+
+def without_slots(cls):
+    """Copy of a __slots__ class whose objects use a __dict__ again (the old layout)"""
+    namespace = {name: value for name, value in vars(cls).items()
+                 if name not in cls.__slots__ and name != '__slots__'}
+    return type(cls.__name__ + 'WithDict', (), namespace)
+
+
+def bytes_per_entity(create, count):
+    """Average memory of count objects made by create() (includes their attributes)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = [create() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The list itself holds one pointer per entity; do not count it
+    return round((after - before - sys.getsizeof(entities)) / len(entities), 1)
+
+
+def micro_entity_memory(count=100_000):
+    """Bytes per entity for 100k balls, circles, birds and pipes, before and after"""
+    import demo5_classes
+    import demo6_flappy_bird
+    import numpy as np
+    from ball_system import BallSystem
+
+    random.seed(0)
+    results = {}
+    for cls, create in ((demo5_classes.Ball, lambda c: c(400, 300)),
+                        (demo6_flappy_bird.Bird, lambda c: c()),
+                        (demo6_flappy_bird.Pipe, lambda c: c(500))):
+        with_dict = without_slots(cls)
+        results[cls.__name__] = {
+            'dict_bytes': bytes_per_entity(lambda: create(with_dict), count),
+            'slots_bytes': bytes_per_entity(lambda: create(cls), count),
+        }
+
+    # demo4 keeps every circle as a dictionary (the lesson of that demo)
+    def circle_dict():
+        return {'x': random.randint(50, 750), 'y': random.randint(50, 550),
+                'color': (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255)),
+                'radius': random.randint(20, 50)}
+
+    system = BallSystem(capacity=count, seed=0)
+    system.add(400, 300, count)
+    # Every array of the system (positions, previous positions, speeds, ...)
+    columns = [value for value in vars(system).values() if isinstance(value, np.ndarray)]
+    results['circle'] = {
+        'dict_bytes': bytes_per_entity(circle_dict, count),
+        'numpy_bytes': sum(column.nbytes for column in columns) / count,
+    }
+    results['count'] = count
+    return results
+
+
+def micro_flappy_env(num_envs=4096, steps=2000):
+    """Environment steps per minute of FlappyEnv on one core"""
+    import numpy as np
+    from flappy_env import FlappyEnv, simple_policy
+
+    rng = np.random.default_rng(0)
+    env = FlappyEnv(num_envs, seed=0)
+    obs = env.reset()
+    games = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        obs, reward, done = env.step(simple_policy(obs, rng, 0.01))
+        games += int(done.sum())
+    seconds = time.perf_counter() - start
+    return {
+        'num_envs': num_envs,
+        'steps': steps,
+        'seconds': round(seconds, 4),
+        'env_steps_per_minute': round(num_envs * steps / seconds * 60),
+        'games_finished': games,
+    }
+
+
+def micro_flappy_hud(frames=1000):
+    """Surfaces and texts the Flappy Bird HUD creates per frame (must be 0)"""
+    import demo6_flappy_bird
+
+    pygame.init()
+    screen = pygame.display.set_mode((400, 600))
+    created = [0]
+    real_surface = pygame.Surface
+
+    class CountingSurface(real_surface):
+        def __init__(self, *args, **kwargs):
+            created[0] += 1
+            super().__init__(*args, **kwargs)
+
+    results = {}
+    pygame.Surface = CountingSurface
+    try:
+        hud = demo6_flappy_bird.Hud()
+        for state, game_over in (('playing', False), ('game_over', True)):
+            hud.draw(screen, 7, 12, game_over)      # first frame may render
+            created[0] = 0
+            renders_before = cache_stats()['text_misses']
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            for _ in range(frames):
+                hud.draw(screen, 7, 12, game_over)
+            seconds = time.perf_counter() - start
+            growth = tracemalloc.get_traced_memory()[0] - before
+            tracemalloc.stop()
+            results[state] = {
+                'surfaces_per_frame': created[0] / frames,
+                'text_renders_per_frame': (cache_stats()['text_misses'] - renders_before) / frames,
+                'python_bytes_kept': growth,
+                'us_per_frame': round(seconds / frames * 1e6, 2),
+            }
+            # A real exception (not assert, which python -O removes): the run fails
+            renders = cache_stats()['text_misses'] - renders_before
+            if created[0] or renders:
+                raise RuntimeError(f"HUD created {created[0]} surfaces and rendered "
+                                   f"{renders} texts in {frames} frames while {state}")
+    finally:
+        pygame.Surface = real_surface
+        pygame.quit()
+    return results
+
+
+def fast_balls(count, speed, rng):
+    """count Ball objects spread over the window, speed times faster than normal"""
+    import demo5_classes
+
+    balls = []
+    for _ in range(count):
+        ball = demo5_classes.Ball(rng.randint(60, 740), rng.randint(60, 540))
+        ball.speed_x *= speed
+        ball.speed_y *= speed
+        balls.append(ball)
+    return balls
+
+
+def overlap_stats(balls):
+    """Number of overlapping pairs and the deepest overlap in pixels"""
+    import demo5_classes
+
+    pairs, deepest = 0, 0.0
+    for ball, other in demo5_classes.SpatialGrid(balls).candidate_pairs():
+        depth = ball.radius + other.radius - ((ball.x - other.x) ** 2 + (ball.y - other.y) ** 2) ** 0.5
+        if depth > 0:
+            pairs += 1
+            deepest = max(deepest, depth)
+    return pairs, deepest
+
+
+def micro_swept_collisions(balls=120, speed=6, pairs=200, frames=300, warmup=60, step_hz=120):
+    """Fast, dense balls with the overlap check (grid) and with swept collisions
+
+    head_on: pairs of small balls flying at each other faster than one ball
+    width per step; counts how many pass through each other.
+    dense: many fast balls; overlapping pairs and depth after each frame,
+    kinetic energy change and time per frame.
+    """
+    import demo5_classes
+    from swept_collisions import SweptCollider
+
+    dt = 60 / step_hz
+    steps = step_hz // 60
+    results = {}
+    for mode in ('grid', 'swept'):
+        collider = SweptCollider(max_events=demo5_classes.MAX_EVENTS)
+
+        def physics_step(balls):
+            if mode == 'swept':
+                collider.step(balls, dt)
+            else:
+                for ball in balls:
+                    ball.move(dt)
+                demo5_classes.collide_with_grid(balls)
+
+        # Head-on: ball pairs 40 px apart per step, radius 15 (30 px across)
+        passed_through = 0
+        for i in range(pairs):
+            left = demo5_classes.Ball(100 + i % 7, 300)
+            right = demo5_classes.Ball(700, 300)
+            left.radius = right.radius = 15
+            left.speed_x, right.speed_x = 40, -40
+            left.speed_y = right.speed_y = 0
+            for _ in range(20):
+                physics_step([left, right])
+                if left.speed_x < 0 or left.x > right.x:
+                    break
+            passed_through += left.x > right.x
+
+        # Dense scene
+        rng = random.Random(0)
+        random.seed(0)
+        scene = fast_balls(balls, speed, rng)
+        # Let the balls that were placed on top of each other move apart first
+        for _ in range(warmup):
+            collider.new_frame()
+            for _ in range(steps):
+                physics_step(scene)
+        energy = sum(b.speed_x ** 2 + b.speed_y ** 2 for b in scene)
+        overlapping, deepest = 0, 0.0
+        events, fallback = 0, 0
+        start = time.perf_counter()
+        for _ in range(frames):
+            collider.new_frame()
+            for _ in range(steps):
+                physics_step(scene)
+            events += collider.events
+            fallback += collider.fallback_pairs
+            count, depth = overlap_stats(scene)
+            overlapping += count
+            deepest = max(deepest, depth)
+        seconds = time.perf_counter() - start
+        results[mode] = {
+            'head_on_passed_through': passed_through,
+            'head_on_pairs': pairs,
+            'overlapping_pairs_per_frame': round(overlapping / frames, 2),
+            'deepest_overlap_px': round(deepest, 2),
+            'energy_change_percent': round(
+                (sum(b.speed_x ** 2 + b.speed_y ** 2 for b in scene) / energy - 1) * 100, 4),
+            'contacts_per_frame': round(events / frames, 1) if mode == 'swept' else None,
+            'fallback_pairs': fallback if mode == 'swept' else None,
+            'ms_per_frame': round(seconds / frames * 1000, 3),
+        }
+    results['balls'] = balls
+    results['speed'] = speed
+    return results
+
+
+def micro_parallel_balls(balls=50_000, steps=20, seed=0):
+    """Milliseconds per step of BallSystem and ParallelBallSystem for each core count"""
+    import numpy as np
+    from ball_system import BallSystem
+    from parallel_balls import ParallelBallSystem, scattered_balls, world_size
+
+    width, height = world_size(balls)
+
+    def time_steps(system):
+        scattered_balls(system, balls, seed)
+        system.step()       # starts the worker processes
+        start = time.perf_counter()
+        for _ in range(steps):
+            system.step()
+        return (time.perf_counter() - start) / steps * 1000, system
+
+    serial_ms, serial = time_steps(BallSystem(width=width, height=height, seed=seed))
+    results = {'balls': balls, 'steps': steps, 'cpu_count': os.cpu_count(),
+               'single_process_ms_per_step': round(serial_ms, 3)}
+    cores = os.cpu_count() or 1
+    counts = sorted({1, cores} | {2 ** k for k in range(1, 6) if 2 ** k < cores})
+    for workers in counts:
+        with ParallelBallSystem(workers, width=width, height=height, seed=seed) as system:
+            ms, system = time_steps(system)
+            n = serial.count
+            difference = max(np.abs(serial.x[:n] - system.x[:n]).max(),
+                             np.abs(serial.y[:n] - system.y[:n]).max())
+        results[f'{workers}_workers'] = {
+            'ms_per_step': round(ms, 3),
+            'speedup': round(serial_ms / ms, 2),
+            'max_position_difference': float(difference),
+        }
+    return results
+
+
+def micro_sleeping_balls(clicks=8, settle_frames=600, measure_frames=100, step_hz=120):
+    """Demo 5 physics with friction: milliseconds per frame once the balls settled"""
+    import demo5_classes
+    from sleeping_balls import SleepingBalls
+
+    dt = 60 / step_hz
+    keep = demo5_classes.FRICTION ** dt
+    results = {}
+    for sleeping in (False, True):
+        random.seed(0)
+        world = SleepingBalls()
+        balls = []
+
+        def click(x, y):
+            for _ in range(50):
+                ball = demo5_classes.Ball(x, y)
+                balls.append(ball)
+                world.add(ball)
+
+        def frame():
+            start = time.perf_counter()
+            for _ in range(step_hz // 60):
+                moving = world.awake if sleeping else balls
+                for ball in moving:
+                    ball.speed_x *= keep
+                    ball.speed_y *= keep
+                    ball.move(dt)
+                demo5_classes.collide_with_grid(moving)
+                if sleeping:
+                    world.touch_sleeping()
+            if sleeping:
+                world.end_frame()
+            return time.perf_counter() - start
+
+        for _ in range(clicks):
+            click(random.randint(50, 750), random.randint(50, 550))
+        for _ in range(settle_frames):
+            frame()
+        settled = sum(frame() for _ in range(measure_frames))
+        awake_settled = len(world.awake) if sleeping else len(balls)
+        click(400, 300)     # new balls run into the heap and wake it up
+        after_click = sum(frame() for _ in range(measure_frames))
+        results['sleeping' if sleeping else 'always_awake'] = {
+            'balls': len(balls),
+            'awake_when_settled': awake_settled,
+            'settled_ms_per_frame': round(settled / measure_frames * 1000, 3),
+            'after_click_ms_per_frame': round(after_click / measure_frames * 1000, 3),
+            'awake_after_click': len(world.awake) if sleeping else len(balls),
+        }
+    return results
+
+
+def micro_vector_minimax(boards=((3, 3), (4, 3), (4, 4))):
+    """Time to solve whole games with vector_minimax, and the Python tree walk for 3×3"""
+    from vector_minimax import solve
+
+    tictactoe = load_tictactoe()
+    start = time.perf_counter()
+    _, nodes = full_tree_search(tictactoe.TicTacToe(), 'X')
+    seconds = time.perf_counter() - start
+    results = {'python_tree_walk_3x3': {'nodes': nodes, 'seconds': round(seconds, 4)}}
+    for size, k in boards:
+        solution = solve(size, k)
+        results[f'{size}x{size}_k{k}'] = {
+            'value_for_x': solution.value([' '] * size * size),
+            'positions': solution.positions,
+            'seconds': round(solution.seconds, 4),
+            'positions_per_sec': round(solution.positions / solution.seconds),
+        }
+    return results
+
+
+def micro_mcts(size=7, k=5, budgets=(0.1, 0.5, 2.0), game_playouts=2000, seed=0):
+    """MCTSPlayer: playouts/s and tree size per time budget and worker count, and tree reuse in a game"""
+    from mcts_player import MCTSPlayer
+    from nk_engine import NKGame
+
+    cores = os.cpu_count() or 1
+    results = {'board': f"{size}x{size}, {k} in a row", 'cpu_count': cores}
+    for workers in sorted({0, cores}):
+        for budget in budgets:
+            with MCTSPlayer('X', time_budget=budget, workers=workers, seed=seed) as player:
+                player.get_move(NKGame(size, k))
+                player.get_move(NKGame(size, k))    # second call: the workers are running
+            stats = player.stats
+            results[f'{workers}_workers_{budget}s'] = {
+                'playouts_per_sec': stats['playouts_per_sec'],
+                'tree_size': stats['tree_size'],
+            }
+
+    # One game against itself with a playout budget: how much of the tree is kept
+    game = NKGame(size, k)
+    players = {letter: MCTSPlayer(letter, time_budget=None, iterations=game_playouts, seed=seed)
+               for letter in 'XO'}
+    letter, reused = 'X', []
+    while game.empty_squares() and not game.current_winner:
+        game.make_move(players[letter].get_move(game), letter)
+        reused.append(players[letter].stats['reused_visits'])
+        letter = 'O' if letter == 'X' else 'X'
+    results['self_play'] = {
+        'moves': len(reused),
+        'playouts_per_move': game_playouts,
+        'mean_reused_visits': round(sum(reused[2:]) / max(1, len(reused) - 2)),
+        'winner': game.current_winner,
+    }
+    return results
+
+
+MICRO_BENCHMARKS = {
+    'tictactoe-board': micro_tictactoe_board,
+    'entity-memory': micro_entity_memory,
+    'flappy-env': micro_flappy_env,
+    'flappy-hud': micro_flappy_hud,
+    'swept-collisions': micro_swept_collisions,
+    'parallel-balls': micro_parallel_balls,
+    'sleeping-balls': micro_sleeping_balls,
+    'vector-minimax': micro_vector_minimax,
+    'mcts': micro_mcts,
+}
+
+
+def peak_rss_kb():
+    """Peak resident memory of this process in KB (None if unknown)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def run_scenario(name, frames, seed, trace_memory=False, trace_file=None):
+    """Run one scenario in this process and return its results"""
+    run, make_script = SCENARIOS[name]
+    random.seed(seed)
+    profiler = ScriptedProfiler(frames, make_script(random.Random(seed)))
+    profiler.trace_file = trace_file
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    run(profiler)
+    wall = time.perf_counter() - start
+
+    result = {
+        'scenario': name,
+        'seed': seed,
+        'frames': len(profiler.samples),
+        'seconds': round(wall, 4),
+        'fps': round(len(profiler.samples) / wall, 2) if wall > 0 else None,
+        'phases_ms': {
+            phase: {stat: round(value, 4) for stat, value in stats.items()}
+            for phase, stats in profiler.summary().items()
+        },
+        'peak_rss_kb': peak_rss_kb(),
+        'text_cache': cache_stats(),
+    }
+    if trace_memory:
+        result['peak_python_kb'] = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+    return result
+
+
+def run_isolated(name, frames, seed, trace_memory=False):
+    """Run one scenario in a fresh Python process"""
+    command = [sys.executable, os.path.abspath(__file__), name,
+               '--frames', str(frames), '--seed', str(seed)]
+    if trace_memory:
+        command.append('--tracemalloc')
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output)[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless benchmark of the pygame demos")
+    parser.add_argument('scenarios', nargs='*',
+                        help="scenarios to run (default: all): " + ", ".join(SCENARIOS))
+    parser.add_argument('--frames', type=int, default=600, help="frames per scenario")
+    parser.add_argument('--seed', type=int, default=1234, help="random seed")
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="also report peak Python heap (slows the run down)")
+    parser.add_argument('--output', help="write JSON to this file instead of stdout")
+    parser.add_argument('--trace', help="save a Chrome trace of every frame (one scenario only)")
+    parser.add_argument('--micro', choices=list(MICRO_BENCHMARKS),
+                        help="run a micro-benchmark instead of the demo scenarios")
+    args = parser.parse_args(argv)
+
+    if args.micro:
+        write_json(MICRO_BENCHMARKS[args.micro](), args.output)
+        return
+
+    names = args.scenarios or list(SCENARIOS)
+    for name in names:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name!r}")
+    if args.trace and len(names) != 1:
+        parser.error("--trace needs exactly one scenario")
+    if len(names) == 1:
+        results = [run_scenario(names[0], args.frames, args.seed, args.tracemalloc, args.trace)]
+    else:
+        results = [run_isolated(name, args.frames, args.seed, args.tracemalloc) for name in names]
+
+    write_json(results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -26,10 +26,23 @@ RED = (200, 0, 0)
 # Game loop - runs continuously while True
 running = True
 color = BLUE
+needs_redraw = True  # Only draw when something changed
 
 while running:
-    # For loop - check all events
-    for event in pygame.event.get():
+    if needs_redraw:
+        # Fill screen with current color
+        screen.fill(color)
+        
+        # Draw some shapes
+        pygame.draw.circle(screen, WHITE, (400, 300), 50)
+        
+        # Update display
+        pygame.display.flip()
+        needs_redraw = False
+
+    # Wait until something happens (uses almost no CPU), then
+    # for loop - check all events
+    for event in [pygame.event.wait()] + pygame.event.get():
         # If condition - check event type
         if event.type == pygame.QUIT:
             running = False
@@ -37,15 +50,10 @@ while running:
             # Conditional - change color on spacebar
             if event.key == pygame.K_SPACE:
                 color = RED if color == BLUE else BLUE
-
-    # Fill screen with current color
-    screen.fill(color)
-    
-    # Draw some shapes
-    pygame.draw.circle(screen, WHITE, (400, 300), 50)
-    
-    # Update display
-    pygame.display.flip()
+                needs_redraw = True
+        elif event.type == pygame.WINDOWEXPOSED:
+            # Window was covered and is visible again
+            needs_redraw = True
 
 pygame.quit()
 sys.exit()
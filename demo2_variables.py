@@ -11,6 +11,8 @@ This demo shows:
 import pygame
 import sys
 
+from text_cache import render_text
+
 pygame.init()
 screen = pygame.display.set_mode((800, 600))
 pygame.display.set_caption("Demo 2: Variables & Movement")
@@ -49,8 +51,7 @@ while running:
     pygame.draw.circle(screen, color, (int(x), int(y)), radius)
     
     # Display variable values as text
-    font = pygame.font.Font(None, 36)
-    text = font.render(f"X: {int(x)} Speed: {speed}", True, (0, 0, 0))
+    text = render_text(f"X: {int(x)} Speed: {speed}", 36, (0, 0, 0))
     screen.blit(text, (10, 10))
     
     pygame.display.flip()
@@ -11,6 +11,8 @@ This demo shows:
 import pygame
 import sys
 
+from text_cache import render_text
+
 pygame.init()
 screen = pygame.display.set_mode((800, 600))
 pygame.display.set_caption("Demo 3: Functions")
@@ -50,8 +52,7 @@ while running:
     draw_square(screen, square_color, 500, 300, 100)
     
     # Instructions
-    font = pygame.font.Font(None, 30)
-    text = font.render("Click to change colors!", True, (0, 0, 0))
+    text = render_text("Click to change colors!", 30, (0, 0, 0))
     screen.blit(text, (250, 50))
     
     pygame.display.flip()
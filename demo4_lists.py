@@ -12,6 +12,8 @@ import pygame
 import sys
 import random
 
+from text_cache import render_text
+
 pygame.init()
 screen = pygame.display.set_mode((800, 600))
 pygame.display.set_caption("Demo 4: Lists")
@@ -53,8 +55,7 @@ while running:
                           (circle['x'], circle['y']), circle['radius'])
     
     # Display list information
-    font = pygame.font.Font(None, 30)
-    text = font.render(f"Circles: {len(circles)} (Click to add more)", True, (0, 0, 0))
+    text = render_text(f"Circles: {len(circles)} (Click to add more)", 30, (0, 0, 0))
     screen.blit(text, (10, 10))
     
     pygame.display.flip()
@@ -13,37 +13,76 @@ import pygame
 import sys
 import random
 
-pygame.init()
-screen = pygame.display.set_mode((800, 600))
-pygame.display.set_caption("Demo 5: Classes & OOP")
+from fixed_timestep import FixedTimestep
+from profiling import NullProfiler, profiler_from_argv
+from sleeping_balls import SleepingBalls
+from swept_collisions import SweptCollider
+from text_cache import render_text
+
+WIDTH = 800
+HEIGHT = 600
+
+# Collision broad phase: True = spatial grid, False = check all pairs.
+# Press G while the demo runs to switch and compare the frame rate.
+USE_SPATIAL_GRID = True
+
+# Swept collisions: True = move balls to the exact moment they touch
+# (swept_collisions.py), so fast balls cannot pass through each other.
+# Press C to switch. MAX_EVENTS limits the contacts handled per frame.
+USE_SWEPT = False
+MAX_EVENTS = 1000
+
+# Friction (F key): each ball keeps FRICTION of its speed per 1/60 s, so
+# the balls slow down and settle in heaps.
+# Sleeping (Z key): balls that stay still are left out of the physics until
+# something touches them (sleeping_balls.py).
+USE_FRICTION = False
+FRICTION = 0.98
+USE_SLEEPING = False
+
+# Physics steps per second, independent of the frame rate (see fixed_timestep.py)
+STEP_HZ = 120
 
 # Class definition - blueprint for Ball objects
 class Ball:
     """A bouncing ball object"""
     
+    # Fixed list of attributes: no __dict__ per ball, so each ball needs less memory
+    __slots__ = ('x', 'y', 'prev_x', 'prev_y', 'radius', 'color', 'speed_x', 'speed_y')
+    
     def __init__(self, x, y):
         """Constructor - runs when creating a new Ball"""
         self.x = x
         self.y = y
+        self.prev_x = x     # position before the last move (for smooth drawing)
+        self.prev_y = y
         self.radius = random.randint(15, 40)
         self.color = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
         self.speed_x = random.choice([-3, -2, 2, 3])
         self.speed_y = random.choice([-3, -2, 2, 3])
     
-    def move(self):
-        """Method to move the ball"""
-        self.x += self.speed_x
-        self.y += self.speed_y
+    def move(self, dt=1.0):
+        """Method to move the ball (dt: length of the step, 1.0 = 1/60 s)"""
+        self.prev_x = self.x
+        self.prev_y = self.y
+        self.x += self.speed_x * dt
+        self.y += self.speed_y * dt
         
         # Bounce off edges
-        if self.x < self.radius or self.x > 800 - self.radius:
+        if self.x < self.radius or self.x > WIDTH - self.radius:
             self.speed_x *= -1
-        if self.y < self.radius or self.y > 600 - self.radius:
+        if self.y < self.radius or self.y > HEIGHT - self.radius:
             self.speed_y *= -1
     
-    def draw(self, surface):
-        """Method to draw the ball"""
-        pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), self.radius)
+    def draw(self, surface, alpha=1.0):
+        """Method to draw the ball (alpha: how far between previous and current position)"""
+        x, y = self.position(alpha)
+        pygame.draw.circle(surface, self.color, (int(x), int(y)), self.radius)
+    
+    def position(self, alpha=1.0):
+        """Position between the previous (alpha=0) and current (alpha=1) position"""
+        return (self.prev_x + (self.x - self.prev_x) * alpha,
+                self.prev_y + (self.y - self.prev_y) * alpha)
     
     def check_collision(self, other):
         """Check if this ball collides with another ball"""
@@ -91,50 +130,218 @@ class Ball:
             other.x += overlap * dx * 0.5
             other.y += overlap * dy * 0.5
 
-# Create list of Ball objects
-balls = []
-for i in range(5):
-    balls.append(Ball(random.randint(100, 700), random.randint(100, 500)))
-
-# Variable to control how many balls are added per click
-balls_per_click = 50
-
-clock = pygame.time.Clock()
-running = True
-
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            # Create multiple Ball objects at mouse position based on balls_per_click
-            for _ in range(balls_per_click):
-                balls.append(Ball(event.pos[0], event.pos[1]))
-            
 
-    screen.fill((255, 255, 255))
+class SpatialGrid:
+    """Uniform grid that finds pairs of balls which are close to each other"""
     
-    # Call methods on each Ball object
-    for ball in balls:
-        ball.move()    # Call move method
+    def __init__(self, balls):
+        """Sort every ball into the grid cell that contains its center"""
+        # A cell as wide as the largest ball means touching balls are
+        # always in the same or in neighbouring cells
+        self.cell_size = 2 * max((ball.radius for ball in balls), default=1)
+        self.cells = {}
+        for ball in balls:
+            key = (int(ball.x // self.cell_size), int(ball.y // self.cell_size))
+            if key in self.cells:
+                self.cells[key].append(ball)
+            else:
+                self.cells[key] = [ball]
     
-    # Check for collisions between all pairs of balls
+    def candidate_pairs(self):
+        """Yield each pair of balls in the same or in neighbouring cells once"""
+        cells = self.cells
+        for (cx, cy), cell in cells.items():
+            # Pairs inside this cell
+            for i in range(len(cell)):
+                for j in range(i + 1, len(cell)):
+                    yield cell[i], cell[j]
+            # Pairs with half of the neighbours, so no pair is seen twice
+            for nx, ny in ((cx + 1, cy), (cx - 1, cy + 1), (cx, cy + 1), (cx + 1, cy + 1)):
+                neighbour = cells.get((nx, ny))
+                if neighbour:
+                    for ball in cell:
+                        for other in neighbour:
+                            yield ball, other
+
+
+def collide_all_pairs(balls):
+    """Check for collisions between all pairs of balls"""
     for i in range(len(balls)):
         for j in range(i + 1, len(balls)):
             if balls[i].check_collision(balls[j]):
                 balls[i].handle_collision(balls[j])
+
+
+def collide_with_grid(balls):
+    """Check for collisions only between balls that are near each other"""
+    for ball, other in SpatialGrid(balls).candidate_pairs():
+        if ball.check_collision(other):
+            ball.handle_collision(other)
+
+
+def ball_mode(use_grid, use_swept, swept, awake=None):
+    """Name of the collision check for the info text (awake: number of awake balls)"""
+    if use_swept:
+        return f"swept, {swept.events} contacts"
+    mode = "grid" if use_grid else "all pairs"
+    return mode if awake is None else f"{mode}, {awake} awake"
+
+
+def main(use_numpy=False, fps=60, profiler=None, timestep=None, workers=0, draw=True):
+    """Run the bouncing balls demo
+
+    use_numpy: vectorized BallSystem instead of Ball objects
+    workers: if not 0, collisions on that many processes (parallel_balls.py, implies use_numpy)
+    fps: frame rate limit (0 = as fast as possible)
+    profiler: optional profiling.FrameProfiler that times each part of the loop
+    timestep: optional FixedTimestep (default: STEP_HZ steps per second of real time)
+    draw: False = skip drawing and showing frames (fast-forward of a replay)
+    """
+    if profiler is None:
+        profiler = NullProfiler()
+    if timestep is None:
+        timestep = FixedTimestep(STEP_HZ)
+    
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Demo 5: Classes & OOP")
     
-    # Draw all balls
+    # Create list of Ball objects
+    balls = []
+    for i in range(5):
+        balls.append(Ball(random.randint(100, 700), random.randint(100, 500)))
+    
+    # Optional: the same balls stored in NumPy arrays (see ball_system.py)
+    system = None
+    if workers:
+        from parallel_balls import ParallelBallSystem
+        system = ParallelBallSystem(workers, seed=random.getrandbits(32))
+    elif use_numpy:
+        from ball_system import BallSystem
+        system = BallSystem(seed=random.getrandbits(32))
+    if system is not None:
+        for ball in balls:
+            system.add_ball(ball)
+    
+    # Keeps track of which balls are asleep (only used with sleeping on)
+    world = SleepingBalls()
     for ball in balls:
-        ball.draw(screen)  # Call draw method
+        world.add(ball)
+    
+    # Variable to control how many balls are added per click
+    balls_per_click = 50
+    use_grid = USE_SPATIAL_GRID
+    use_swept = USE_SWEPT
+    swept = SweptCollider(MAX_EVENTS, WIDTH, HEIGHT)
+    use_friction = USE_FRICTION
+    use_sleeping = USE_SLEEPING
+    
+    # Text rendering is timed on its own ("text", inside "draw")
+    render = profiler.timed("text")(render_text)
     
-    # Display info
-    font = pygame.font.Font(None, 30)
-    text = font.render(f"Balls: {len(balls)} (Click to add {balls_per_click})", True, (0, 0, 0))
-    screen.blit(text, (10, 10))
+    clock = pygame.time.Clock()
+    running = True
     
-    pygame.display.flip()
-    clock.tick(60)
+    while running and profiler.next_frame():
+        with profiler.section("events"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    # Create multiple Ball objects at mouse position based on balls_per_click
+                    if system is not None:
+                        system.add(event.pos[0], event.pos[1], balls_per_click)
+                    else:
+                        for _ in range(balls_per_click):
+                            ball = Ball(event.pos[0], event.pos[1])
+                            balls.append(ball)
+                            world.add(ball)
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_g:
+                    # Switch between spatial grid and all pairs
+                    use_grid = not use_grid
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_c:
+                    # Switch between swept and overlap collisions (Ball objects only)
+                    use_swept = not use_swept
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_f:
+                    use_friction = not use_friction
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_z:
+                    use_sleeping = not use_sleeping
+        
+        # Sleeping works with the overlap check only; wake everybody otherwise
+        sleeping = use_sleeping and not use_swept
+        if not sleeping:
+            world.wake_all()
+        
+        # Run as many fixed physics steps as real time has passed
+        swept.new_frame()
+        for _ in range(timestep.steps()):
+            # Balls that take part in this step
+            moving = world.awake if sleeping else balls
+            with profiler.section("update"):
+                if system is not None:
+                    system.move(timestep.scale)
+                else:
+                    if use_friction:
+                        keep = FRICTION ** timestep.scale
+                        for ball in moving:
+                            ball.speed_x *= keep
+                            ball.speed_y *= keep
+                    if not use_swept:
+                        # Call methods on each Ball object
+                        for ball in moving:
+                            ball.move(timestep.scale)    # Call move method
+            
+            # Check for collisions between balls
+            with profiler.section("collide"):
+                if system is not None:
+                    system.collide()
+                elif use_swept:
+                    # Moves the balls too, stopping at every contact
+                    swept.step(balls, timestep.scale)
+                elif use_grid:
+                    collide_with_grid(moving)
+                else:
+                    collide_all_pairs(moving)
+                if sleeping:
+                    world.touch_sleeping()
+        if sleeping:
+            world.end_frame()
+        alpha = timestep.alpha
+        
+        if draw:
+            with profiler.section("draw"):
+                screen.fill((255, 255, 255))
+                
+                # Draw all balls
+                if system is not None:
+                    system.draw(screen, alpha)
+                    count = len(system)
+                    mode = f"numpy, {workers} processes" if workers else "numpy"
+                else:
+                    for ball in balls:
+                        ball.draw(screen, alpha)  # Call draw method
+                    count = len(balls)
+                    mode = ball_mode(use_grid, use_swept, swept, len(world.awake) if sleeping else None)
+                
+                # Display info
+                text = render(f"Balls: {count} (Click to add {balls_per_click}) "
+                                   f"Collisions: {mode} (G/C) FPS: {clock.get_fps():.0f}", 30, (0, 0, 0))
+                screen.blit(text, (10, 10))
+            
+            profiler.overlay(screen)
+            with profiler.section("flip"):
+                pygame.display.flip()
+        clock.tick(fps)
+    
+    if system is not None:
+        system.close()
+    profiler.finish()
+    pygame.quit()
+
 
-pygame.quit()
-sys.exit()
+if __name__ == '__main__':
+    # --parallel N: collisions on N worker processes (parallel_balls.py)
+    workers = int(sys.argv[sys.argv.index('--parallel') + 1]) if '--parallel' in sys.argv else 0
+    main(use_numpy='--numpy' in sys.argv, profiler=profiler_from_argv(sys.argv),
+         workers=workers)
+    sys.exit()
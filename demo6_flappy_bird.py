@@ -13,9 +13,9 @@ import pygame
 import sys
 import random
 
-pygame.init()
-screen = pygame.display.set_mode((400, 600))
-pygame.display.set_caption("Demo 6: Flappy Bird")
+from fixed_timestep import FixedTimestep
+from profiling import NullProfiler, profiler_from_argv
+from text_cache import render_text
 
 # Colors
 WHITE = (255, 255, 255)
@@ -25,11 +25,18 @@ GREEN = (34, 139, 34)
 YELLOW = (255, 255, 0)
 RED = (255, 0, 0)
 
+# Physics steps per second, independent of the frame rate (see fixed_timestep.py)
+STEP_HZ = 120
+
 # Bird class
 class Bird:
+    # Fixed list of attributes: less memory than a __dict__ per object
+    __slots__ = ('x', 'y', 'prev_y', 'radius', 'velocity', 'gravity', 'jump_strength')
+    
     def __init__(self):
         self.x = 80
         self.y = 250
+        self.prev_y = self.y    # height before the last update (for smooth drawing)
         self.radius = 15
         self.velocity = 0
         self.gravity = 0.5
@@ -39,10 +46,11 @@ class Bird:
         """Make the bird jump"""
         self.velocity = self.jump_strength
     
-    def update(self):
-        """Update bird position with gravity"""
-        self.velocity += self.gravity
-        self.y += self.velocity
+    def update(self, dt=1.0):
+        """Update bird position with gravity (dt: length of the step, 1.0 = 1/60 s)"""
+        self.prev_y = self.y
+        self.velocity += self.gravity * dt
+        self.y += self.velocity * dt
         
         # Keep bird on screen
         if self.y < self.radius:
@@ -52,36 +60,46 @@ class Bird:
             self.y = 600 - self.radius
             self.velocity = 0
     
-    def draw(self, surface):
-        """Draw the bird"""
-        pygame.draw.circle(surface, YELLOW, (int(self.x), int(self.y)), self.radius)
+    def draw(self, surface, alpha=1.0):
+        """Draw the bird between its previous (alpha=0) and current (alpha=1) height"""
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        pygame.draw.circle(surface, YELLOW, (int(self.x), int(y)), self.radius)
         # Eye
-        pygame.draw.circle(surface, BLACK, (int(self.x + 5), int(self.y - 3)), 3)
+        pygame.draw.circle(surface, BLACK, (int(self.x + 5), int(y - 3)), 3)
 
 # Pipe class
 class Pipe:
+    __slots__ = ('x', 'prev_x', 'width', 'gap', 'top_height', 'speed', 'passed')
+    
     def __init__(self, x):
-        self.x = x
         self.width = 60
         self.gap = 150
-        self.top_height = random.randint(100, 400)
         self.speed = 3
+        self.place(x)
+    
+    def place(self, x):
+        """Put the pipe at x with a new random gap (also used to reuse an old pipe)"""
+        self.x = x
+        self.prev_x = x
+        self.top_height = random.randint(100, 400)
         self.passed = False
     
-    def update(self):
+    def update(self, dt=1.0):
         """Move pipe to the left"""
-        self.x -= self.speed
+        self.prev_x = self.x
+        self.x -= self.speed * dt
     
-    def draw(self, surface):
-        """Draw the pipe"""
+    def draw(self, surface, alpha=1.0):
+        """Draw the pipe between its previous (alpha=0) and current (alpha=1) place"""
+        x = self.prev_x + (self.x - self.prev_x) * alpha
         # Top pipe
-        pygame.draw.rect(surface, GREEN, (self.x, 0, self.width, self.top_height))
-        pygame.draw.rect(surface, BLACK, (self.x, 0, self.width, self.top_height), 2)
+        pygame.draw.rect(surface, GREEN, (x, 0, self.width, self.top_height))
+        pygame.draw.rect(surface, BLACK, (x, 0, self.width, self.top_height), 2)
         
         # Bottom pipe
         bottom_y = self.top_height + self.gap
-        pygame.draw.rect(surface, GREEN, (self.x, bottom_y, self.width, 600 - bottom_y))
-        pygame.draw.rect(surface, BLACK, (self.x, bottom_y, self.width, 600 - bottom_y), 2)
+        pygame.draw.rect(surface, GREEN, (x, bottom_y, self.width, 600 - bottom_y))
+        pygame.draw.rect(surface, BLACK, (x, bottom_y, self.width, 600 - bottom_y), 2)
     
     def is_offscreen(self):
         """Check if pipe is off screen"""
@@ -96,118 +114,253 @@ class Pipe:
                 return True
         return False
 
-# Game variables
-bird = Bird()
-pipes = [Pipe(500)]
-score = 0
-high_score = 0
-game_over = False
-clock = pygame.time.Clock()
-running = True
-
-def reset_game():
-    """Reset game to initial state"""
-    global bird, pipes, score, game_over
-    bird = Bird()
-    pipes = [Pipe(500)]
-    score = 0
-    game_over = False
+class PipePool:
+    """The pipes on screen, oldest (leftmost) first, in a ring buffer.
+    
+    A pipe that leaves the screen is not thrown away: its place in the
+    ring is reused for the next new pipe, so a long game does not create
+    and delete Pipe objects all the time. The ring grows if more pipes
+    are on screen at once than it has places.
+    """
+    
+    def __init__(self, capacity=4):
+        self.slots = [None] * capacity
+        self.start = 0      # place of the oldest pipe
+        self.count = 0      # number of pipes on screen
+    
+    def __len__(self):
+        return self.count
+    
+    def __iter__(self):
+        slots = self.slots
+        capacity = len(slots)
+        for i in range(self.start, self.start + self.count):
+            yield slots[i % capacity]
+    
+    def newest(self):
+        """The pipe added last (the rightmost one)"""
+        return self.slots[(self.start + self.count - 1) % len(self.slots)]
+    
+    def add(self, x):
+        """Add a pipe at x, reusing an old Pipe object if there is one"""
+        if self.count == len(self.slots):
+            # Full: make the ring twice as big, oldest pipe first again
+            self.slots = list(self) + [None] * len(self.slots)
+            self.start = 0
+        index = (self.start + self.count) % len(self.slots)
+        pipe = self.slots[index]
+        if pipe is None:
+            pipe = self.slots[index] = Pipe(x)
+        else:
+            pipe.place(x)
+        self.count += 1
+        return pipe
+    
+    def remove_offscreen(self):
+        """Drop the pipes that have left the screen (always the oldest ones)"""
+        slots = self.slots
+        while self.count and slots[self.start].is_offscreen():
+            self.start = (self.start + 1) % len(slots)
+            self.count -= 1
+    
+    def clear(self):
+        """Remove all pipes (the Pipe objects stay for reuse)"""
+        self.start = 0
+        self.count = 0
 
-# Main game loop
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_SPACE:
-                if not game_over:
-                    bird.jump()
-                else:
-                    reset_game()
-            elif event.key == pygame.K_ESCAPE:
-                running = False
-    
-    if not game_over:
-        # Update bird
-        bird.update()
-        
-        # Update pipes
-        for pipe in pipes:
-            pipe.update()
-            
-            # Check collision
-            if pipe.collides_with(bird):
-                game_over = True
-                if score > high_score:
-                    high_score = score
-            
-            # Score when passing pipe
-            if not pipe.passed and pipe.x + pipe.width < bird.x:
-                pipe.passed = True
-                score += 1
-        
-        # Remove offscreen pipes and add new ones
-        pipes = [pipe for pipe in pipes if not pipe.is_offscreen()]
-        
-        if len(pipes) == 0 or pipes[-1].x < 200:
-            pipes.append(Pipe(500))
+
+def outlined_text(text, size, color, offset):
+    """Text with a black copy behind it, moved by offset pixels, in one surface"""
+    front = render_text(text, size, color)
+    outline = render_text(text, size, BLACK)
+    width, height = front.get_size()
+    surface = pygame.Surface((width + offset, height + offset), pygame.SRCALPHA)
+    surface.blit(outline, (offset, offset))
+    surface.blit(front, (0, 0))
+    return surface
+
+
+class Hud:
+    """Score, high score and game over screen.
+
+    Everything is drawn once and kept; a picture is only made again when
+    the number on it changes, so a normal frame creates no new surfaces.
+    """
+    
+    def __init__(self):
+        # Semi-transparent overlay for the game over screen
+        self.overlay = pygame.Surface((400, 600))
+        self.overlay.set_alpha(128)
+        self.overlay.fill(BLACK)
+        self.score = None
+        self.high_score = None
+        self.game_over_score = None
+        self.score_surface = None
+        self.high_score_surface = None
+        self.game_over_texts = []   # (surface, position) of each game over text
+    
+    def draw(self, surface, score, high_score, game_over):
+        """Draw the score (and the game over screen) onto surface"""
+        if score != self.score:
+            self.score = score
+            self.score_surface = outlined_text(str(score), 48, WHITE, 2)
+        if high_score != self.high_score:
+            self.high_score = high_score
+            self.high_score_surface = outlined_text(f"High Score: {high_score}", 30, WHITE, 1)
+        surface.blit(self.score_surface, (200, 50))
+        surface.blit(self.high_score_surface, (10, 10))
         
-        # Check if bird hit ground or ceiling
-        if bird.y >= 600 - bird.radius or bird.y <= bird.radius:
-            game_over = True
-            if score > high_score:
-                high_score = score
+        if game_over:
+            if score != self.game_over_score:
+                self.game_over_score = score
+                self.game_over_texts = self.make_game_over(score)
+            surface.blit(self.overlay, (0, 0))
+            surface.blits(self.game_over_texts, doreturn=False)
     
-    # Draw everything
-    screen.fill(BLUE)
+    @staticmethod
+    def make_game_over(score):
+        """The texts of the game over screen and where they go"""
+        return [(render_text("GAME OVER", 72, RED), (50, 200)),
+                (render_text(f"Score: {score}", 48, WHITE), (120, 280)),
+                (render_text("Press SPACE to restart", 30, WHITE), (80, 350)),
+                (render_text("Press ESC to quit", 30, WHITE), (100, 380))]
+
+
+def new_game(pipes=None):
+    """Return the starting state: bird, pipes, score and game_over
+
+    pipes: PipePool of the last game, reused so its Pipe objects are recycled
+    """
+    if pipes is None:
+        pipes = PipePool()
+    pipes.clear()
+    pipes.add(500)
+    return Bird(), pipes, 0, False
+
+
+def update_world(bird, pipes, dt=1.0):
+    """Move the bird and all pipes by one physics step"""
+    # Update bird
+    bird.update(dt)
     
-    # Draw pipes
+    # Update pipes
     for pipe in pipes:
-        pipe.draw(screen)
-    
-    # Draw bird
-    bird.draw(screen)
-    
-    # Draw score
-    font = pygame.font.Font(None, 48)
-    score_text = font.render(str(score), True, WHITE)
-    score_outline = font.render(str(score), True, BLACK)
-    screen.blit(score_outline, (202, 52))
-    screen.blit(score_text, (200, 50))
-    
-    # Draw high score
-    small_font = pygame.font.Font(None, 30)
-    high_score_text = small_font.render(f"High Score: {high_score}", True, WHITE)
-    high_score_outline = small_font.render(f"High Score: {high_score}", True, BLACK)
-    screen.blit(high_score_outline, (11, 11))
-    screen.blit(high_score_text, (10, 10))
-    
-    # Draw game over screen
-    if game_over:
-        # Semi-transparent overlay
-        overlay = pygame.Surface((400, 600))
-        overlay.set_alpha(128)
-        overlay.fill(BLACK)
-        screen.blit(overlay, (0, 0))
+        pipe.update(dt)
+
+
+def check_world(bird, pipes, score):
+    """Collisions, scoring and new pipes after a step.
+
+    Returns the new (pipes, score, game_over). flappy_env.py repeats these
+    rules with NumPy arrays for many games at once.
+    """
+    game_over = False
+    for pipe in pipes:
+        # Pipes are sorted from left to right: this one and all after it
+        # are still in front of the bird, so they can neither hit nor score
+        if pipe.x >= bird.x + bird.radius:
+            break
         
-        # Game over text
-        game_over_font = pygame.font.Font(None, 72)
-        game_over_text = game_over_font.render("GAME OVER", True, RED)
-        screen.blit(game_over_text, (50, 200))
+        # Score when passing pipe
+        if not pipe.passed and pipe.x + pipe.width < bird.x:
+            pipe.passed = True
+            score += 1
         
-        # Final score
-        final_score_text = font.render(f"Score: {score}", True, WHITE)
-        screen.blit(final_score_text, (120, 280))
+        # Check collision only with pipes that overlap the bird
+        if pipe.x + pipe.width > bird.x - bird.radius and pipe.collides_with(bird):
+            game_over = True
+    
+    # Remove offscreen pipes and add new ones
+    pipes.remove_offscreen()
+    
+    if len(pipes) == 0 or pipes.newest().x < 200:
+        pipes.add(500)
+    
+    # Check if bird hit ground or ceiling
+    if bird.y >= 600 - bird.radius or bird.y <= bird.radius:
+        game_over = True
+    return pipes, score, game_over
+
+
+def main(fps=60, profiler=None, timestep=None, draw=True):
+    """Run the Flappy Bird game
+
+    fps: frame rate limit (0 = as fast as possible)
+    profiler: optional profiling.FrameProfiler that times each part of the loop
+    timestep: optional FixedTimestep (default: STEP_HZ steps per second of real time)
+    draw: False = skip drawing and showing frames (fast-forward of a replay)
+    """
+    if profiler is None:
+        profiler = NullProfiler()
+    if timestep is None:
+        timestep = FixedTimestep(STEP_HZ)
+    
+    pygame.init()
+    screen = pygame.display.set_mode((400, 600))
+    pygame.display.set_caption("Demo 6: Flappy Bird")
+    
+    # Game variables
+    bird, pipes, score, game_over = new_game()
+    hud = Hud()
+    high_score = 0
+    clock = pygame.time.Clock()
+    running = True
+    
+    # Main game loop
+    while running and profiler.next_frame():
+        with profiler.section("events"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_SPACE:
+                        if not game_over:
+                            bird.jump()
+                        else:
+                            # Reset game to initial state
+                            bird, pipes, score, game_over = new_game(pipes)
+                    elif event.key == pygame.K_ESCAPE:
+                        running = False
         
-        # Instructions
-        restart_text = small_font.render("Press SPACE to restart", True, WHITE)
-        screen.blit(restart_text, (80, 350))
+        # Run as many fixed physics steps as real time has passed
+        for _ in range(timestep.steps()):
+            if game_over:
+                break
+            with profiler.section("update"):
+                update_world(bird, pipes, timestep.scale)
+            
+            with profiler.section("collide"):
+                pipes, score, game_over = check_world(bird, pipes, score)
+                if game_over and score > high_score:
+                    high_score = score
         
-        quit_text = small_font.render("Press ESC to quit", True, WHITE)
-        screen.blit(quit_text, (100, 380))
+        if draw:
+            with profiler.section("draw"):
+                # Draw everything
+                screen.fill(BLUE)
+                
+                # Between the last two physics steps (a finished game stands still)
+                alpha = 1.0 if game_over else timestep.alpha
+                
+                # Draw pipes
+                for pipe in pipes:
+                    pipe.draw(screen, alpha)
+                
+                # Draw bird
+                bird.draw(screen, alpha)
+                
+                # Draw score, high score and the game over screen
+                hud.draw(screen, score, high_score, game_over)
+            
+            profiler.overlay(screen)
+            with profiler.section("flip"):
+                pygame.display.flip()
+        clock.tick(fps)
     
-    pygame.display.flip()
-    clock.tick(60)
+    profiler.finish()
+    pygame.quit()
+
 
-pygame.quit()
-sys.exit()
+if __name__ == '__main__':
+    main(profiler=profiler_from_argv(sys.argv))
+    sys.exit()
@@ -0,0 +1,226 @@
+"""
+Flappy Env: Many Flappy Bird Games Without a Window
+===================================================
+For training or tuning a computer player we need to play thousands of
+games quickly. FlappyEnv runs N independent games of demo 6 at once, with
+the state of all games in NumPy arrays and nothing drawn.
+
+    env = FlappyEnv(num_envs=1000, seed=1)
+    obs = env.reset()
+    obs, reward, done = env.step(actions)   # actions: 1 = flap, 0 = do nothing
+
+- obs: one row per game: bird height, bird speed, distance to the next
+  pipe, top and bottom of its gap
+- reward: points scored in this step (1 for each pipe passed)
+- done: the game ended in this step; it starts again by itself, and
+  env.final_score holds the score it reached
+
+The rules are the ones of demo6_flappy_bird.py (update_world and
+check_world), step for step. Game i with seed s places its pipes like the
+interactive game after random.seed(s + i), so both give the same result
+for the same inputs. Check it with:
+
+    python flappy_env.py --verify
+"""
+
+import random
+import sys
+
+import numpy as np
+
+from demo6_flappy_bird import STEP_HZ, Bird
+from fixed_timestep import BASE_HZ
+
+# Bird and pipe settings (same values as Bird and Pipe in demo 6)
+_BIRD = Bird()
+BIRD_X = _BIRD.x
+BIRD_Y = _BIRD.y
+RADIUS = _BIRD.radius
+GRAVITY = _BIRD.gravity
+JUMP = _BIRD.jump_strength
+PIPE_WIDTH = 60
+PIPE_GAP = 150
+PIPE_SPEED = 3
+PIPE_START = 500
+HEIGHT = 600
+
+MAX_PIPES = 4       # pipes on screen at the same time (2 in practice)
+
+
+class FlappyEnv:
+    """num_envs independent Flappy Bird games, stepped together"""
+
+    def __init__(self, num_envs=1, seed=None, step_hz=STEP_HZ):
+        self.num_envs = num_envs
+        self.dt = BASE_HZ / step_hz
+        n = num_envs
+        self.bird_y = np.zeros(n)
+        self.bird_v = np.zeros(n)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.final_score = np.zeros(n, dtype=np.int64)
+        self.pipe_x = np.zeros((n, MAX_PIPES))
+        self.pipe_top = np.zeros((n, MAX_PIPES))
+        self.pipe_passed = np.zeros((n, MAX_PIPES), dtype=bool)
+        self.pipe_alive = np.zeros((n, MAX_PIPES), dtype=bool)
+        self.newest = np.zeros(n, dtype=np.intp)   # slot of the last added pipe
+        self.rows = np.arange(n)
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        """One random generator per game: game i uses seed + i"""
+        if seed is None:
+            self.rngs = [random.Random() for _ in range(self.num_envs)]
+        else:
+            self.rngs = [random.Random(seed + i) for i in range(self.num_envs)]
+
+    def reset(self, seed=None):
+        """Start all games again; returns the first observation"""
+        if seed is not None:
+            self.seed(seed)
+        self._reset_games(self.rows)
+        return self.observe()
+
+    def _reset_games(self, games):
+        """Like new_game() in demo 6, for the games with these indices"""
+        self.bird_y[games] = BIRD_Y
+        self.bird_v[games] = 0
+        self.score[games] = 0
+        self.pipe_alive[games] = False
+        self.pipe_passed[games] = False
+        self._add_pipes(games)
+
+    def _add_pipes(self, games):
+        """Add a new pipe at the right edge in each of these games"""
+        slots = np.argmin(self.pipe_alive[games], axis=1)    # first free slot
+        rngs = self.rngs
+        self.pipe_x[games, slots] = PIPE_START
+        self.pipe_top[games, slots] = [rngs[i].randint(100, 400) for i in games.tolist()]
+        self.pipe_passed[games, slots] = False
+        self.pipe_alive[games, slots] = True
+        self.newest[games] = slots
+
+    def step(self, actions):
+        """Advance every game by one step; returns (obs, reward, done)"""
+        dt = self.dt
+        y, v = self.bird_y, self.bird_v
+
+        # Bird.jump and Bird.update
+        v[np.asarray(actions, dtype=bool)] = JUMP
+        v += GRAVITY * dt
+        y += v * dt
+        above = y < RADIUS
+        y[above] = RADIUS
+        v[above] = 0
+        below = y > HEIGHT - RADIUS
+        y[below] = HEIGHT - RADIUS
+        v[below] = 0
+
+        # Pipe.update
+        x = self.pipe_x
+        x -= PIPE_SPEED * dt
+        alive = self.pipe_alive
+
+        # Pipe.collides_with
+        bird_y = y[:, None]
+        in_x_range = (BIRD_X + RADIUS > x) & (BIRD_X - RADIUS < x + PIPE_WIDTH)
+        outside_gap = ((bird_y - RADIUS < self.pipe_top)
+                       | (bird_y + RADIUS > self.pipe_top + PIPE_GAP))
+        hit = (alive & in_x_range & outside_gap).any(axis=1)
+
+        # Score when passing pipe
+        passed = alive & ~self.pipe_passed & (x + PIPE_WIDTH < BIRD_X)
+        self.pipe_passed |= passed
+        reward = passed.sum(axis=1)
+        self.score += reward
+
+        # Remove offscreen pipes and add new ones
+        alive &= ~(x + PIPE_WIDTH < 0)
+        need_pipe = ~alive.any(axis=1) | (x[self.rows, self.newest] < 200)
+        if need_pipe.any():
+            self._add_pipes(np.flatnonzero(need_pipe))
+
+        # Bird hit a pipe, the ground or the ceiling
+        done = hit | (y >= HEIGHT - RADIUS) | (y <= RADIUS)
+        if done.any():
+            finished = np.flatnonzero(done)
+            self.final_score[finished] = self.score[finished]
+            self._reset_games(finished)
+        return self.observe(), reward, done
+
+    def observe(self):
+        """Bird height and speed, distance to the next pipe, top and bottom of its gap"""
+        ahead = self.pipe_alive & (self.pipe_x + PIPE_WIDTH >= BIRD_X - RADIUS)
+        next_pipe = np.argmin(np.where(ahead, self.pipe_x, np.inf), axis=1)
+        pipe_x = self.pipe_x[self.rows, next_pipe]
+        top = self.pipe_top[self.rows, next_pipe]
+        return np.stack([self.bird_y, self.bird_v, pipe_x - BIRD_X, top, top + PIPE_GAP], axis=1)
+
+
+def play_interactive_rules(seed, actions, step_hz=STEP_HZ):
+    """Play one game with the Bird/Pipe objects of demo 6 (restarting when it ends).
+
+    Returns (bird y, score, game over) after every step, like one column of FlappyEnv.
+    """
+    import demo6_flappy_bird as game
+
+    dt = BASE_HZ / step_hz
+    random.seed(seed)
+    bird, pipes, score, game_over = game.new_game()
+    history = []
+    for flap in actions:
+        if flap:
+            bird.jump()
+        game.update_world(bird, pipes, dt)
+        pipes, score, game_over = game.check_world(bird, pipes, score)
+        history.append((bird.y, score, game_over))
+        if game_over:
+            bird, pipes, score, game_over = game.new_game(pipes)
+    return history
+
+
+def simple_policy(obs, rng, noise):
+    """Flap when falling below the gap, plus random flaps with probability noise"""
+    falling_low = (obs[:, 0] > obs[:, 4] - 40) & (obs[:, 1] > 0)
+    return falling_low | (rng.random(len(obs)) < noise)
+
+
+def verify(num_envs=20, steps=5000, seed=7):
+    """Compare FlappyEnv with the interactive game rules; returns True if equal"""
+    rng = np.random.default_rng(seed)
+    # Different amounts of random flapping, so some games last long and some not
+    noise = np.linspace(0, 0.05, num_envs)
+    env = FlappyEnv(num_envs, seed=seed)
+    obs = env.reset()
+    actions = []
+    env_history = []
+    for t in range(steps):
+        actions.append(simple_policy(obs, rng, noise))
+        obs, _, done = env.step(actions[-1])
+        # A finished game restarts at once; its score is then in final_score
+        score = np.where(done, env.final_score, env.score)
+        env_history.append((env.bird_y.copy(), score, done))
+    actions = np.array(actions)
+
+    for i in range(num_envs):
+        expected = play_interactive_rules(seed + i, actions[:, i])
+        for t, (bird_y, score, game_over) in enumerate(expected):
+            env_y, env_score, env_done = env_history[t]
+            if bool(env_done[i]) != game_over or int(env_score[i]) != score:
+                print(f"game {i} differs at step {t}")
+                return False
+            if not game_over and float(env_y[i]) != bird_y:
+                print(f"game {i}: bird height differs at step {t}")
+                return False
+    return True
+
+
+def main():
+    if '--verify' in sys.argv:
+        ok = verify()
+        print("FlappyEnv matches demo6_flappy_bird" if ok else "FlappyEnv DIFFERS")
+        sys.exit(0 if ok else 1)
+    print(__doc__)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""
+Inline Executor: Run a Task Right Away
+======================================
+TicTacToe-pygame.py lets the computer think on a worker thread
+(AI_WORKER), so the window keeps reacting. For a benchmark or a replay
+that is a problem: when the move arrives depends on how fast the thread
+is, so two runs play different games.
+
+RunNow has the same submit() as concurrent.futures executors, but runs
+the function at once and returns a future that is already done:
+
+    play_game("hard", executor=RunNow())
+"""
+
+from concurrent.futures import Future
+
+
+class RunNow:
+    """Executor that runs each task in the calling thread, during submit()"""
+
+    def submit(self, function, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(function(*args, **kwargs))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+    def shutdown(self, wait=True):
+        """Nothing to stop"""
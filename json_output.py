@@ -0,0 +1,20 @@
+"""
+JSON Output: Print or Save Measurement Results
+==============================================
+benchmark.py and tournament.py report their results as JSON. This module
+only needs the standard library, so scripts can use it without importing
+benchmark.py (which switches SDL to the dummy driver and loads pygame and
+the demos).
+"""
+
+import json
+
+
+def write_json(results, output=None):
+    """Print results as JSON, or write them to the file output"""
+    text = json.dumps(results, indent=2)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
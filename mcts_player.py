@@ -0,0 +1,336 @@
+"""
+MCTS Player: Monte Carlo Tree Search for Tic Tac Toe on Any Board
+=================================================================
+MinimaxPlayer looks at every position, which is hopeless beyond 3×3, and
+ComputerPlayer plays at random. MCTSPlayer plays many random games
+(playouts) and spends more of them on the moves that look best so far:
+
+1. selection: from the root, follow the child with the highest UCT score
+   wins / visits + EXPLORATION * sqrt(ln(parent visits) / visits)
+   (good moves are tried more, rarely tried moves still get a chance)
+2. expansion: add one untried move of the position reached to the tree
+3. playout: finish the game from there with random moves
+4. backpropagation: count the result in every node on the way back up
+
+It plays the most visited move. The budget per move is a time
+(`time_budget` seconds) and/or a number of playouts (`iterations`).
+
+Faster playouts:
+- with `workers` > 0 the playouts run in a pool of processes
+  (ProcessPoolExecutor): `batch` leaves (BATCH per worker) are selected
+  first and their playouts are sent as one chunk per worker; to keep the
+  leaves of one batch apart, each selection already counts a visit on its
+  way down (virtual loss) and the result is added when it comes back
+- the tree is kept between moves: the subtree under the two moves played
+  since the last call becomes the new root, with all its playouts
+
+After each move `player.stats` holds playouts, playouts per second and the
+tree size, so strength can be traded against time per move.
+
+Run it:
+    python mcts_player.py                       # first move on 3×3, 1 s
+    python mcts_player.py 7 5 --time 2          # 7×7, 5 in a row
+    python mcts_player.py 7 5 --workers 4       # playouts on 4 processes
+"""
+
+import argparse
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from nk_engine import board_geometry
+
+EXPLORATION = 1.4   # UCT constant: higher tries more of the rarely visited moves
+BATCH = 64          # leaves per worker selected before their playouts run
+
+
+class Node:
+    """A position in the search tree, reached by `move` of `letter`"""
+
+    __slots__ = ('move', 'letter', 'parent', 'children', 'untried', 'visits', 'wins', 'winner',
+                 'finished')
+
+    def __init__(self, move, letter, parent, untried, winner=None, finished=False):
+        self.move = move
+        self.letter = letter        # player who made `move` (wins count for this player)
+        self.parent = parent
+        self.children = []
+        self.untried = untried      # moves not yet added as children
+        self.visits = 0
+        self.wins = 0.0             # 1 per won playout, 0.5 per draw
+        self.winner = winner        # letter if `move` completed a line
+        self.finished = finished    # the game is over in this position
+
+    def uct_child(self, exploration):
+        """Child with the highest UCT score"""
+        log_visits = math.log(self.visits)
+        best, best_score = None, -1.0
+        for child in self.children:
+            if child.visits == 0:
+                return child
+            score = child.wins / child.visits + exploration * math.sqrt(log_visits / child.visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+
+def completes_line(board, square, windows, through):
+    """Does the mark on square complete one of its windows?"""
+    letter = board[square]
+    return any(all(board[s] == letter for s in windows[w]) for w in through[square])
+
+
+def playout(board, letter, size, k, rng):
+    """Finish a game with random moves; returns the winner ('X', 'O') or None"""
+    windows, through = board_geometry(size, k)
+    # Stones of each player in every window, so a move only adds 1 to a few counters
+    counts = {'X': [0] * len(windows), 'O': [0] * len(windows)}
+    empty = []
+    for square, cell in enumerate(board):
+        if cell == ' ':
+            empty.append(square)
+        else:
+            own = counts[cell]
+            for w in through[square]:
+                own[w] += 1
+    rng.shuffle(empty)
+    other = 'O' if letter == 'X' else 'X'
+    own, opponent = counts[letter], counts[other]
+    for square in empty:
+        for w in through[square]:
+            own[w] += 1
+            if own[w] == k:
+                return letter
+        letter, other = other, letter
+        own, opponent = opponent, own
+    return None
+
+
+def playout_batch(jobs, size, k, seed):
+    """Worker: one playout per (board, letter to move); returns the winners"""
+    rng = random.Random(seed)
+    return [playout(board, letter, size, k, rng) for board, letter in jobs]
+
+
+_neighbour_cache = {}
+
+
+def neighbours(size):
+    """The squares around each square of a size×size board"""
+    if size not in _neighbour_cache:
+        table = []
+        for square in range(size * size):
+            row, col = divmod(square, size)
+            table.append(tuple(r * size + c
+                               for r in range(max(0, row - 1), min(size, row + 2))
+                               for c in range(max(0, col - 1), min(size, col + 2))
+                               if (r, c) != (row, col)))
+        _neighbour_cache[size] = table
+    return _neighbour_cache[size]
+
+
+def candidates(board, size):
+    """Moves worth adding to the tree: next to a stone on big boards, all empty squares on small ones"""
+    stones = [square for square, cell in enumerate(board) if cell != ' ']
+    if size <= 4 or not stones:
+        return [square for square, cell in enumerate(board) if cell == ' ']
+    table = neighbours(size)
+    return sorted({other for square in stones for other in table[square] if board[other] == ' '})
+
+
+class MCTSPlayer:
+    """UCT player for TicTacToe and NKGame with a time and/or playout budget"""
+
+    def __init__(self, letter, time_budget=1.0, iterations=None, workers=0, batch=None,
+                 exploration=EXPLORATION, seed=None):
+        self.letter = letter
+        self.time_budget = time_budget      # seconds per move (None: no limit)
+        self.iterations = iterations        # playouts per move (None: no limit)
+        self.workers = workers              # 0: playouts in this process
+        # Without workers there is nothing to wait for: one leaf at a time
+        self.batch = batch or (BATCH * workers if workers > 0 else 1)
+        self.exploration = exploration
+        self.rng = random.Random(seed) if seed is not None else random.Random(random.random())
+        self.pool = None
+        self.root = None
+        self.root_board = None
+        self.tree_size = 0
+        self.stats = {}
+        self.cancelled = False
+        if time_budget is None and iterations is None:
+            raise ValueError("give a time_budget, iterations or both")
+
+    def get_move(self, game):
+        """Run playouts until the budget is used up and return the most visited move"""
+        self.cancelled = False
+        board = list(game.board)
+        size = getattr(game, 'size', 3)
+        k = getattr(game, 'k', 3)
+        reused = self._reuse(board)
+        if not reused:
+            self.root = Node(None, 'O' if self.letter == 'X' else 'X', None, candidates(board, size))
+            self.tree_size = 1
+        self.root_board = board
+        reused_visits = self.root.visits
+
+        start = time.perf_counter()
+        deadline = start + self.time_budget if self.time_budget is not None else None
+        playouts = 0
+        while True:
+            count = self.batch
+            if self.iterations is not None:
+                count = max(1, min(count, self.iterations - playouts))
+            playouts += self._run_batch(board, size, k, count)
+            if self.iterations is not None and playouts >= self.iterations:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if self.cancelled:
+                break
+
+        best = max(self.root.children, key=lambda child: child.visits)
+        seconds = time.perf_counter() - start
+        self.stats = {
+            'playouts': playouts,
+            'seconds': round(seconds, 4),
+            'playouts_per_sec': round(playouts / seconds) if seconds > 0 else None,
+            'tree_size': self.tree_size,
+            'reused_visits': reused_visits,
+            'win_rate': round(best.wins / best.visits, 3) if best.visits else None,
+        }
+        # Keep the subtree of the chosen move for the next call
+        board[best.move] = self.letter
+        self._descend(best, board)
+        return best.move
+
+    def cancel(self):
+        """Stop a running get_move() after its current batch; it returns its best move so far"""
+        self.cancelled = True
+
+    def _reuse(self, board):
+        """Make the subtree of the current board the root; returns False if it is not in the tree"""
+        if self.root is None or self.root_board is None:
+            return False
+        new = [square for square, (old, cell) in enumerate(zip(self.root_board, board))
+               if old != cell]
+        if any(self.root_board[square] != ' ' for square in new) or len(new) > 1:
+            return False        # a new game, or more moves than the opponent's one
+        if not new:
+            return True
+        for child in self.root.children:
+            if child.move == new[0]:
+                self._descend(child, board)
+                return True
+        return False
+
+    def _descend(self, child, board):
+        """Make child the new root and forget the rest of the tree"""
+        child.parent = None
+        self.root = child
+        self.root_board = list(board)
+        self.tree_size = self._count(child)
+
+    @staticmethod
+    def _count(node):
+        count, stack = 0, [node]
+        while stack:
+            node = stack.pop()
+            count += 1
+            stack.extend(node.children)
+        return count
+
+    def _select(self, board, size, k):
+        """Selection and expansion of one leaf; counts a visit on the path (virtual loss)"""
+        windows, through = board_geometry(size, k)
+        node = self.root
+        board = list(board)
+        node.visits += 1
+        while not node.finished:
+            if node.untried:
+                move = node.untried.pop(self.rng.randrange(len(node.untried)))
+                letter = 'O' if node.letter == 'X' else 'X'
+                board[move] = letter
+                winner = letter if completes_line(board, move, windows, through) else None
+                finished = winner is not None or ' ' not in board
+                child = Node(move, letter, node, [] if finished else candidates(board, size),
+                             winner, finished)
+                node.children.append(child)
+                self.tree_size += 1
+                node = child
+                node.visits += 1
+                break
+            node = node.uct_child(self.exploration)
+            board[node.move] = node.letter
+            node.visits += 1
+        return node, board
+
+    def _run_batch(self, board, size, k, count):
+        """Select count leaves, play them out (in the pool if there is one) and backpropagate"""
+        leaves, jobs = [], []
+        for _ in range(count):
+            node, leaf_board = self._select(board, size, k)
+            if node.finished:
+                self._backpropagate(node, node.winner)
+            else:
+                leaves.append(node)
+                jobs.append((leaf_board, 'O' if node.letter == 'X' else 'X'))
+        for node, winner in zip(leaves, self._playouts(jobs, size, k)):
+            self._backpropagate(node, winner)
+        return count
+
+    def _playouts(self, jobs, size, k):
+        if not jobs:
+            return []
+        if self.workers <= 0:
+            return [playout(leaf, letter, size, k, self.rng) for leaf, letter in jobs]
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        chunk = -(-len(jobs) // self.workers)
+        futures = [self.pool.submit(playout_batch, jobs[i:i + chunk], size, k,
+                                    self.rng.getrandbits(32))
+                   for i in range(0, len(jobs), chunk)]
+        return [winner for future in futures for winner in future.result()]
+
+    @staticmethod
+    def _backpropagate(node, winner):
+        """Add the result to every node up to the root (the visits were counted in _select)"""
+        while node is not None:
+            if winner is None:
+                node.wins += 0.5
+            elif winner == node.letter:
+                node.wins += 1
+            node = node.parent
+
+    def close(self):
+        """Stop the worker processes (if any)"""
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Let MCTSPlayer choose the first move and show its statistics")
+    parser.add_argument('size', type=int, nargs='?', default=3)
+    parser.add_argument('k', type=int, nargs='?', default=None)
+    parser.add_argument('--time', type=float, default=1.0, help="seconds per move")
+    parser.add_argument('--workers', type=int, default=0, help="playout processes (0: none)")
+    parser.add_argument('--batch', type=int, default=None, help="leaves per batch")
+    args = parser.parse_args()
+    from nk_engine import NKGame
+
+    game = NKGame(args.size, args.k or min(args.size, 5))
+    with MCTSPlayer('X', time_budget=args.time, workers=args.workers, batch=args.batch) as player:
+        move = player.get_move(game)
+    print(f"{game.size}×{game.size}, {game.k} in a row: X plays {divmod(move, game.size)}")
+    print(player.stats)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,318 @@
+"""
+N×N, K-in-a-Row Engine
+======================
+Tic tac toe is the 3×3, 3-in-a-row case of a bigger family of games:
+5×5 with 4 in a row, 15×15 gomoku with 5 in a row, ...
+
+Full minimax is hopeless on those boards, so SearchPlayer uses:
+- iterative deepening: search depth 1, 2, 3, ... until the time is up
+- alpha-beta pruning with a transposition table (Zobrist hashing)
+- a heuristic evaluation: every run of K squares that only one player
+  uses is worth more the more stones it holds
+- move ordering: best move from the previous depth first, then moves
+  that build or block the most
+- a time budget per move, so the answer always comes in time
+
+After each move `player.stats` holds the depth reached, nodes searched
+and nodes per second.
+
+NKGame has the same methods as TicTacToe in TicTacToe-pygame.py, so the
+other players and the drawing code work with it too.
+"""
+
+import random
+import time
+
+WIN_SCORE = 10 ** 9
+
+_geometry_cache = {}
+
+
+def board_geometry(size, k):
+    """All K-in-a-row windows of a board, and the windows through each square"""
+    if (size, k) not in _geometry_cache:
+        windows = []
+        for row in range(size):
+            for col in range(size):
+                for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_row = row + d_row * (k - 1)
+                    end_col = col + d_col * (k - 1)
+                    if 0 <= end_row < size and 0 <= end_col < size:
+                        windows.append(tuple((row + d_row * i) * size + col + d_col * i
+                                             for i in range(k)))
+        through = [[] for _ in range(size * size)]
+        for index, window in enumerate(windows):
+            for square in window:
+                through[square].append(index)
+        _geometry_cache[size, k] = (tuple(windows), tuple(tuple(w) for w in through))
+    return _geometry_cache[size, k]
+
+
+def window_values(k):
+    """VALUES[x][o]: worth of a window with x X-stones and o O-stones, for X"""
+    values = [[0] * (k + 1) for _ in range(k + 1)]
+    for count in range(1, k):
+        values[count][0] = 10 ** count
+        values[0][count] = -10 ** count
+    return values
+
+
+class NKGame:
+    """Board of size×size squares; k in a row wins"""
+
+    def __init__(self, size=3, k=3):
+        self.size = size
+        self.k = k
+        self.windows, self.windows_through = board_geometry(size, k)
+        self.values = window_values(k)
+        # Zobrist keys: one random number per (square, player)
+        rng = random.Random(size * 100 + k)
+        self.zobrist = {letter: [rng.getrandbits(64) for _ in range(size * size)]
+                        for letter in 'XO'}
+        self.reset()
+
+    def reset(self):
+        """Reset the board"""
+        self.board = [' '] * (self.size * self.size)
+        self.current_winner = None
+        self.moves_made = 0
+        self.x_count = [0] * len(self.windows)
+        self.o_count = [0] * len(self.windows)
+        self.score = 0      # heuristic value for X, kept up to date move by move
+        self.hash = 0
+
+    def copy(self):
+        """Independent copy of the game"""
+        other = NKGame.__new__(NKGame)
+        other.__dict__.update(self.__dict__)
+        other.board = list(self.board)
+        other.x_count = list(self.x_count)
+        other.o_count = list(self.o_count)
+        return other
+
+    def available_moves(self):
+        """Return list of available positions"""
+        return [i for i, spot in enumerate(self.board) if spot == ' ']
+
+    def empty_squares(self):
+        """Check if there are empty squares"""
+        return self.moves_made < len(self.board)
+
+    def num_empty_squares(self):
+        """Count empty squares"""
+        return len(self.board) - self.moves_made
+
+    def make_move(self, square, letter):
+        """Make a move if valid"""
+        if self.board[square] != ' ':
+            return False
+        self.board[square] = letter
+        self.moves_made += 1
+        self.hash ^= self.zobrist[letter][square]
+        self._update_windows(square, letter, 1)
+        return True
+
+    def undo_move(self, square):
+        """Take back the move on square"""
+        letter = self.board[square]
+        self._update_windows(square, letter, -1)
+        self.hash ^= self.zobrist[letter][square]
+        self.board[square] = ' '
+        self.moves_made -= 1
+        self.current_winner = None
+
+    def _update_windows(self, square, letter, step):
+        """Add (step=1) or remove (step=-1) a stone in all windows through square"""
+        values = self.values
+        x_count, o_count = self.x_count, self.o_count
+        own = x_count if letter == 'X' else o_count
+        score = self.score
+        for w in self.windows_through[square]:
+            score -= values[x_count[w]][o_count[w]]
+            own[w] += step
+            score += values[x_count[w]][o_count[w]]
+            if own[w] == self.k and step == 1:
+                self.current_winner = letter
+        self.score = score
+
+    def winner(self, square, letter):
+        """Check if the stone on square completes k in a row"""
+        own = self.x_count if letter == 'X' else self.o_count
+        return any(own[w] == self.k for w in self.windows_through[square])
+
+
+class _SearchTimeout(Exception):
+    """Raised inside the search when the time budget is used up"""
+
+
+# Kinds of values stored in the transposition table
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+
+class SearchPlayer:
+    """Iterative-deepening alpha-beta player for NKGame (and TicTacToe)"""
+
+    def __init__(self, letter, time_budget=1.0, max_depth=None):
+        self.letter = letter
+        self.time_budget = time_budget      # seconds per move
+        self.max_depth = max_depth
+        self.table = {}
+        self.stats = {}
+        self.deadline = 0
+
+    def get_move(self, game):
+        """Search as deep as the time budget allows and return the best move"""
+        if not isinstance(game, NKGame):
+            game = self._as_nk_game(game)
+        else:
+            game = game.copy()   # a timeout may leave moves on the search board
+
+        start = time.perf_counter()
+        self.deadline = start + self.time_budget
+        self.nodes = 0
+        moves = self._candidates(game)
+        best_move, best_score, depth_reached = moves[0], 0, 0
+        max_depth = min(self.max_depth or game.num_empty_squares(), game.num_empty_squares())
+
+        for depth in range(1, max_depth + 1):
+            try:
+                score, move = self._root(game, depth, best_move)
+            except _SearchTimeout:
+                break
+            best_move, best_score, depth_reached = move, score, depth
+            elapsed = time.perf_counter() - start
+            # Result is certain, or the next depth would not finish in time anyway
+            if abs(score) >= WIN_SCORE - 1000 or elapsed * 4 > self.time_budget:
+                break
+
+        seconds = time.perf_counter() - start
+        self.stats = {
+            'depth': depth_reached,
+            'nodes': self.nodes,
+            'seconds': round(seconds, 4),
+            'nodes_per_sec': round(self.nodes / seconds) if seconds > 0 else None,
+            'score': best_score,
+        }
+        return best_move
+
+    def cancel(self):
+        """Stop a running get_move() soon; it returns its best move so far"""
+        self.deadline = 0
+
+    @staticmethod
+    def _as_nk_game(game):
+        """Copy a 3×3 TicTacToe/BitboardTicTacToe into an NKGame"""
+        board = game.board
+        nk = NKGame(3, 3)
+        for square, letter in enumerate(board):
+            if letter != ' ':
+                nk.make_move(square, letter)
+        return nk
+
+    def _candidates(self, game):
+        """Empty squares next to a stone (all empty squares on small boards)"""
+        board = game.board
+        size = game.size
+        if game.moves_made == 0:
+            return [(size // 2) * size + size // 2]
+        if size <= 4:
+            return [i for i, spot in enumerate(board) if spot == ' ']
+        near = set()
+        for square, spot in enumerate(board):
+            if spot != ' ':
+                row, col = divmod(square, size)
+                for r in range(max(0, row - 1), min(size, row + 2)):
+                    for c in range(max(0, col - 1), min(size, col + 2)):
+                        if board[r * size + c] == ' ':
+                            near.add(r * size + c)
+        return sorted(near)
+
+    def _ordered(self, game, player, moves, first):
+        """Moves sorted by how much they build and block, `first` in front"""
+        values = game.values
+        x_count, o_count = game.x_count, game.o_count
+
+        def priority(square):
+            total = 0
+            for w in game.windows_through[square]:
+                total += abs(values[x_count[w]][o_count[w]])
+            return total
+
+        moves = sorted(moves, key=priority, reverse=True)
+        if first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def _root(self, game, depth, first):
+        """Search all root moves to depth; returns (score, best move)"""
+        player = self.letter
+        other = 'O' if player == 'X' else 'X'
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        best_move = None
+        for move in self._ordered(game, player, self._candidates(game), first):
+            game.make_move(move, player)
+            if game.current_winner:
+                score = WIN_SCORE - 1
+            elif not game.empty_squares():
+                score = 0
+            else:
+                score = -self._negamax(game, other, depth - 1, 2, -beta, -alpha)
+            game.undo_move(move)
+            if best_move is None or score > alpha:
+                alpha, best_move = score, move
+        return alpha, best_move
+
+    def _negamax(self, game, player, depth, ply, alpha, beta):
+        """Score for player to move; the previous move did not end the game"""
+        self.nodes += 1
+        if self.nodes & 1023 == 0 and time.perf_counter() > self.deadline:
+            raise _SearchTimeout()
+
+        if depth == 0:
+            return game.score if player == 'X' else -game.score
+
+        key = (game.hash, player)
+        entry = self.table.get(key)
+        first = None
+        if entry is not None:
+            entry_depth, value, kind, first = entry
+            if entry_depth >= depth:
+                if kind == EXACT:
+                    return value
+                if kind == LOWER_BOUND and value >= beta:
+                    return value
+                if kind == UPPER_BOUND and value <= alpha:
+                    return value
+
+        other = 'O' if player == 'X' else 'X'
+        moves = self._candidates(game)
+        if depth > 1:
+            moves = self._ordered(game, player, moves, first)
+
+        original_alpha = alpha
+        best, best_move = -WIN_SCORE - 1, None
+        for move in moves:
+            game.make_move(move, player)
+            if game.current_winner:
+                score = WIN_SCORE - ply
+            elif not game.empty_squares():
+                score = 0
+            else:
+                score = -self._negamax(game, other, depth - 1, ply + 1, -beta, -alpha)
+            game.undo_move(move)
+            if score > best:
+                best, best_move = score, move
+                if best > alpha:
+                    alpha = best
+                    if alpha >= beta:
+                        break
+
+        if best <= original_alpha:
+            kind = UPPER_BOUND
+        elif best >= beta:
+            kind = LOWER_BOUND
+        else:
+            kind = EXACT
+        self.table[key] = (depth, best, kind, best_move)
+        return best
@@ -0,0 +1,265 @@
+"""
+Parallel Balls: Ball Collisions on Several CPU Cores
+====================================================
+With tens of thousands of balls, BallSystem.collide() takes longer than a
+frame on one core. ParallelBallSystem splits the window into vertical
+tiles with about the same number of balls each, and lets a pool of worker
+processes find and resolve the collisions inside each tile at the same
+time:
+
+1. the ball arrays live in shared memory (multiprocessing.shared_memory),
+   so the workers read the positions and write their results without
+   copying the arrays between processes
+2. each worker handles the pairs with both balls in its tile
+3. the main process then handles the pairs that cross a tile border (only
+   balls near a border can be part of one)
+
+BallSystem resolves all contacts of a step from the same positions, so it
+does not matter which process handles a pair: the result is the same as
+BallSystem with the same seed, up to the order in which floating point
+numbers are added (check with `python parallel_balls.py --verify`).
+Moving the balls stays in the main process; it is one fast NumPy
+operation per array.
+
+    system = ParallelBallSystem(workers=4, seed=1)
+    system.add(400, 300, 20000)
+    system.step()
+    system.close()      # stop the workers and free the shared memory
+
+Start demo 5 with it:
+    python demo5_classes.py --parallel 4
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ball_system import HEIGHT, MAX_RADIUS, WIDTH, BallSystem, contacts, grid_pairs
+
+# Arrays the workers need (the others are only used by the main process)
+SHARED = ('x', 'y', 'vx', 'vy', 'radius', 'order', 'dvx', 'dvy', 'dx', 'dy')
+
+# Shared memory blocks a worker process has opened: name -> SharedMemory
+_attached = {}
+
+
+def _worker_arrays(blocks):
+    """NumPy views of the shared arrays, opened once per worker process"""
+    arrays = {}
+    for column, (name, shape, dtype) in blocks.items():
+        if name not in _attached:
+            _attached[name] = shared_memory.SharedMemory(name=name)
+        arrays[column] = np.ndarray(shape, dtype=dtype, buffer=_attached[name].buf)
+    # Blocks of arrays that have grown since are not needed any more
+    names = {name for name, _, _ in blocks.values()}
+    for name in list(_attached):
+        if name not in names:
+            _attached.pop(name).close()
+    return arrays
+
+
+def collide_tile(blocks, start, end):
+    """Worker: resolve the pairs inside one tile (balls order[start:end])
+
+    Writes the change of speed and position of each ball of the tile into
+    dvx/dvy/dx/dy and returns the number of contacts.
+    """
+    a = _worker_arrays(blocks)
+    index = a['order'][start:end]
+    x, y, radius = a['x'][index], a['y'][index], a['radius'][index]
+    vx, vy = a['vx'][index], a['vy'][index]
+    i, j = grid_pairs(x, y, radius)
+    i, j, dvx, dvy, dx, dy = contacts(x, y, vx, vy, radius, i, j)
+    n = len(index)
+    a['dvx'][index] = np.bincount(j, dvx, n) - np.bincount(i, dvx, n)
+    a['dvy'][index] = np.bincount(j, dvy, n) - np.bincount(i, dvy, n)
+    a['dx'][index] = np.bincount(j, dx, n) - np.bincount(i, dx, n)
+    a['dy'][index] = np.bincount(j, dy, n) - np.bincount(i, dy, n)
+    return len(i)
+
+
+class ParallelBallSystem(BallSystem):
+    """BallSystem whose collisions are resolved in a process pool, one tile per task"""
+
+    def __init__(self, workers=None, tiles=None, capacity=1024, width=WIDTH, height=HEIGHT,
+                 seed=None):
+        self._blocks = {}       # id of an array -> its SharedMemory
+        self.workers = workers or os.cpu_count() or 1
+        self.tiles = tiles or self.workers
+        super().__init__(capacity, width, height, seed)
+        self._new_work_arrays()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    def _new_array(self, shape, dtype=np.float64):
+        """A zeroed array in a new shared memory block"""
+        size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        block = shared_memory.SharedMemory(create=True, size=size)
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        array[...] = 0
+        self._blocks[id(array)] = block
+        return array
+
+    def _new_work_arrays(self):
+        """Tile order and per-ball results, as long as the ball arrays"""
+        capacity = len(self.x)
+        self.order = self._new_array(capacity, np.intp)
+        for name in ('dvx', 'dvy', 'dx', 'dy'):
+            setattr(self, name, self._new_array(capacity))
+
+    def _reserve(self, extra):
+        old = {name: getattr(self, name) for name in
+               ('x', 'y', 'prev_x', 'prev_y', 'vx', 'vy', 'radius', 'color',
+                'order', 'dvx', 'dvy', 'dx', 'dy')}
+        super()._reserve(extra)
+        if self.x is old['x']:
+            return
+        self._new_work_arrays()
+        for array in old.values():
+            self._free(array)
+
+    def _free(self, array):
+        """Give the shared memory of an array back"""
+        block = self._blocks.pop(id(array))
+        block.close()
+        block.unlink()
+
+    def _shared_blocks(self):
+        """Name, shape and type of every shared array, for the workers"""
+        blocks = {}
+        for column in SHARED:
+            array = getattr(self, column)
+            blocks[column] = (self._blocks[id(array)].name, array.shape, array.dtype.str)
+        return blocks
+
+    def split(self):
+        """Sort the balls into tiles; returns the x position of each border
+
+        The borders are at quantiles of x, so every tile has about the same
+        number of balls even when they are bunched up on one side.
+        """
+        n = self.count
+        x = self.x[:n]
+        borders = np.quantile(x, np.arange(1, self.tiles) / self.tiles)
+        tile = np.searchsorted(borders, x, side='right')
+        self.order[:n] = np.argsort(tile, kind='stable')
+        self.tile = tile
+        self.tile_start = np.searchsorted(tile[self.order[:n]], np.arange(self.tiles + 1))
+        return borders
+
+    def border_pairs(self, borders):
+        """Candidate pairs of balls in different tiles
+
+        Two touching balls are less than two radii apart, so both are that
+        close to the border between them: only these balls are checked.
+        """
+        n = self.count
+        if len(borders) == 0:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        x = self.x[:n]
+        reach = 2 * self.radius[:n].max()
+        near = np.abs(x[:, None] - borders[None, :]).min(axis=1) < reach
+        index = np.flatnonzero(near)
+        i, j = grid_pairs(x[index], self.y[index], self.radius[index])
+        i, j = index[i], index[j]
+        crossing = self.tile[i] != self.tile[j]
+        return i[crossing], j[crossing]
+
+    def collide(self):
+        """Resolve all overlapping pairs (same rule and result as BallSystem.collide)"""
+        n = self.count
+        if n < 2:
+            return 0
+        borders = self.split()
+
+        # 1. Pairs inside a tile, one task per tile
+        blocks = self._shared_blocks()
+        starts = self.tile_start
+        jobs = [self.pool.submit(collide_tile, blocks, starts[t], starts[t + 1])
+                for t in range(self.tiles) if starts[t + 1] > starts[t]]
+        contact_count = sum(job.result() for job in jobs)
+
+        # 2. Pairs across a border
+        i, j = self.border_pairs(borders)
+        i, j, dvx, dvy, dx, dy = contacts(self.x, self.y, self.vx, self.vy, self.radius, i, j)
+        contact_count += len(i)
+
+        # 3. Apply the changes of both parts at once, as BallSystem.collide does
+        self.vx[:n] += self.dvx[:n] + np.bincount(j, dvx, n) - np.bincount(i, dvx, n)
+        self.vy[:n] += self.dvy[:n] + np.bincount(j, dvy, n) - np.bincount(i, dvy, n)
+        self.x[:n] += self.dx[:n] + np.bincount(j, dx, n) - np.bincount(i, dx, n)
+        self.y[:n] += self.dy[:n] + np.bincount(j, dy, n) - np.bincount(i, dy, n)
+        return contact_count
+
+    def close(self):
+        """Stop the worker processes and free the shared memory"""
+        if self.pool is None:
+            return
+        self.pool.shutdown()
+        self.pool = None
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def scattered_balls(system, balls, seed):
+    """Add balls at random places of the system's world (same balls for the same seed)"""
+    rng = np.random.default_rng(seed)
+    first = system.count
+    system.add(0, 0, balls)
+    n = system.count
+    system.x[first:n] = system.prev_x[first:n] = rng.uniform(MAX_RADIUS, system.width - MAX_RADIUS, balls)
+    system.y[first:n] = system.prev_y[first:n] = rng.uniform(MAX_RADIUS, system.height - MAX_RADIUS, balls)
+    return system
+
+
+def world_size(balls):
+    """Width and height of a world where balls cover about a third of the area"""
+    side = int((balls * 8000) ** 0.5)
+    return side, side
+
+
+def verify(balls=20000, steps=50, workers=4, seed=3, tolerance=1e-6):
+    """Step BallSystem and ParallelBallSystem side by side; returns True if they match
+
+    The balls are spread over a world big enough for them: demo 5's window
+    packed with 20000 balls is so crowded that BallSystem itself is not
+    stable, and tiny differences of the additions grow without limit.
+    """
+    width, height = world_size(balls)
+    serial = scattered_balls(BallSystem(width=width, height=height, seed=seed), balls, seed)
+    with ParallelBallSystem(workers, width=width, height=height, seed=seed) as parallel:
+        scattered_balls(parallel, balls, seed)
+        largest = 0.0
+        for _ in range(steps):
+            serial.step()
+            parallel.step()
+            n = serial.count
+            largest = max(largest,
+                          np.abs(serial.x[:n] - parallel.x[:n]).max(),
+                          np.abs(serial.y[:n] - parallel.y[:n]).max(),
+                          np.abs(serial.vx[:n] - parallel.vx[:n]).max(),
+                          np.abs(serial.vy[:n] - parallel.vy[:n]).max())
+    print(f"{balls} balls, {steps} steps, {workers} workers: "
+          f"largest difference {largest:.3g} (tolerance {tolerance:g})")
+    return largest <= tolerance
+
+
+def main():
+    if '--verify' in sys.argv:
+        sys.exit(0 if verify() else 1)
+    print(__doc__)
+
+
+if __name__ == '__main__':
+    main()
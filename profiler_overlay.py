@@ -0,0 +1,101 @@
+"""
+Profiler Overlay: Frame Statistics on the Screen
+================================================
+Draws a small panel in the top right corner with:
+- frames per second and the average frame time
+- a histogram of the frame times (how many frames took 0-2 ms, 2-4 ms, ...)
+  with a red line at 16.7 ms, the time one frame may take at 60 FPS
+- the average milliseconds of every profiler section
+
+Used by FrameProfiler.overlay() (see profiling.py). The numbers are
+updated twice per second so they can be read (and only then rendered).
+"""
+
+import pygame
+
+from text_cache import render_text
+
+WINDOW_FRAMES = 120         # frames the statistics are taken from
+UPDATE_EVERY = 30           # frames between updates of the numbers
+BIN_MS = 2                  # width of one histogram bar in milliseconds
+BINS = 16                   # the last bar counts everything slower
+BUDGET_MS = 1000 / 60
+
+PANEL_WIDTH = 220
+BAR_WIDTH = PANEL_WIDTH // BINS
+HISTOGRAM_HEIGHT = 50
+LINE_HEIGHT = 18
+TEXT_SIZE = 20
+
+_state = {'frame': None, 'lines': [], 'counts': [0] * BINS, 'background': None}
+
+
+def _update(profiler):
+    """Recompute the text lines and histogram from the last frames"""
+    samples = list(profiler.samples)[-WINDOW_FRAMES:]
+    counts = [0] * BINS
+    sections = {}
+    for sample in samples:
+        for name, seconds in sample.items():
+            sections[name] = sections.get(name, 0.0) + seconds * 1000
+        counts[min(int(sample['frame'] * 1000 / BIN_MS), BINS - 1)] += 1
+
+    lines = []
+    if samples:
+        frame_ms = sections.pop('frame') / len(samples)
+        lines.append(f"{1000 / frame_ms:.0f} FPS  {frame_ms:.2f} ms/frame")
+        for name, total_ms in sections.items():
+            lines.append(f"{name}: {total_ms / len(samples):.2f} ms")
+    _state['lines'] = lines
+    _state['counts'] = counts
+    _state['frame'] = profiler.frame_count
+
+
+def _background(height):
+    """Semi-transparent dark panel, made once per height"""
+    background = _state['background']
+    if background is None or background.get_height() != height:
+        background = pygame.Surface((PANEL_WIDTH + 10, height))
+        background.set_alpha(170)
+        background.fill((0, 0, 0))
+        _state['background'] = background
+    return background
+
+
+def draw_overlay(surface, profiler):
+    """Draw the statistics of profiler in the top right corner of surface"""
+    if _state['frame'] is None or abs(profiler.frame_count - _state['frame']) >= UPDATE_EVERY:
+        _update(profiler)
+    lines, counts = _state['lines'], _state['counts']
+
+    left = surface.get_width() - PANEL_WIDTH - 10
+    height = 10 + HISTOGRAM_HEIGHT + 10 + LINE_HEIGHT * len(lines)
+    surface.blit(_background(height), (left - 5, 0))
+
+    # Histogram of frame times
+    bottom = 10 + HISTOGRAM_HEIGHT
+    tallest = max(counts) or 1
+    for i, count in enumerate(counts):
+        bar = HISTOGRAM_HEIGHT * count // tallest
+        if bar:
+            color = (80, 200, 80) if (i + 1) * BIN_MS <= BUDGET_MS else (230, 150, 40)
+            pygame.draw.rect(surface, color, (left + i * BAR_WIDTH, bottom - bar, BAR_WIDTH - 1, bar))
+    budget_x = left + int(BUDGET_MS / BIN_MS * BAR_WIDTH)
+    pygame.draw.line(surface, (230, 50, 50), (budget_x, 10), (budget_x, bottom))
+
+    # FPS and milliseconds per section
+    y = bottom + 10
+    for line in lines:
+        surface.blit(render_text(line, TEXT_SIZE, (255, 255, 255)), (left, y))
+        y += LINE_HEIGHT
+
+
+def _on_quit():
+    _state['background'] = None
+    _state['frame'] = None
+    # pygame forgets its quit functions after calling them, so register again
+    pygame.register_quit(_on_quit)
+
+
+# Surfaces cannot be used after pygame.quit(), so start over next time
+pygame.register_quit(_on_quit)
@@ -0,0 +1,210 @@
+"""
+Profiling: Timing the Parts of a Game Loop
+==========================================
+A game loop does the same few things every frame: handle events, update
+the game, draw, and show the picture. FrameProfiler measures how long each
+of these sections takes, frame by frame.
+
+Usage inside a demo loop:
+
+    while running and profiler.next_frame():
+        with profiler.section("events"):
+            ...
+        with profiler.section("draw"):
+            ...
+
+or wrap a function so every call is timed:
+
+    collide = profiler.timed("collide")(collide_with_grid)
+
+When profiling is off the demos use NullProfiler, which does nothing
+(timed() returns the function itself, so there is no cost at all).
+
+With overlay=True the profiler also draws FPS, a frame time histogram and
+the milliseconds per section on the screen (profiler_overlay.py), and with
+trace_file it saves every frame as a Chrome trace when the demo ends
+(open it in chrome://tracing or https://ui.perfetto.dev). In the demos:
+
+    python demo5_classes.py --profile
+    python demo5_classes.py --trace trace.json
+"""
+
+import json
+import time
+from collections import deque
+from functools import wraps
+
+
+class _NullSection:
+    """Context manager that does nothing"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class NullProfiler:
+    """Profiler used when profiling is off - every call is a no-op"""
+
+    _section = _NullSection()
+    show_overlay = False
+
+    def next_frame(self):
+        """Start a new frame; always keep running"""
+        return True
+
+    def section(self, name):
+        """Time nothing"""
+        return self._section
+
+    def timed(self, name):
+        """Decorator that leaves the function as it is"""
+        return _unchanged
+
+    def overlay(self, surface):
+        """Draw nothing"""
+
+    def finish(self):
+        """Save nothing"""
+
+
+def _unchanged(function):
+    return function
+
+
+class _Section:
+    """Context manager that adds its run time to the current frame"""
+
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        profiler = self.profiler
+        current = profiler.current
+        current[self.name] = current.get(self.name, 0.0) + elapsed
+        profiler.current_trace.append((self.name, self.start, elapsed))
+        return False
+
+
+class FrameProfiler:
+    """Records the time of every named section for each frame"""
+
+    def __init__(self, max_frames=None, max_samples=None, overlay=False, trace_file=None):
+        """max_frames: stop the demo after this many frames (None = never)
+        max_samples: keep only the last frames (None = all)
+        overlay: draw the statistics on the screen (see overlay())
+        trace_file: save a Chrome trace there in finish()
+        """
+        self.max_frames = max_frames
+        self.frame_count = 0
+        # one {section: seconds} dict and one [(section, start, seconds)] list per finished frame
+        self.samples = [] if max_samples is None else deque(maxlen=max_samples)
+        self.traces = [] if max_samples is None else deque(maxlen=max_samples)
+        self.current = {}
+        self.current_trace = []
+        self.frame_start = None
+        self.show_overlay = overlay
+        self.trace_file = trace_file
+
+    def next_frame(self):
+        """Finish the previous frame and start a new one.
+
+        Returns False once max_frames frames have run, so the demo loop stops.
+        """
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self.current['frame'] = now - self.frame_start
+            self.current_trace.append(('frame', self.frame_start, now - self.frame_start))
+            self.samples.append(self.current)
+            self.traces.append(self.current_trace)
+        if self.max_frames is not None and self.frame_count >= self.max_frames:
+            self.frame_start = None
+            return False
+        self.current = {}
+        self.current_trace = []
+        self.frame_start = now
+        self.frame_count += 1
+        return True
+
+    def section(self, name):
+        """Time a `with` block as part of the current frame"""
+        return _Section(self, name)
+
+    def timed(self, name):
+        """Decorator: time every call of the function as section name"""
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                with _Section(self, name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def overlay(self, surface):
+        """Draw FPS, frame time histogram and section times (if overlay is on)"""
+        if self.show_overlay:
+            from profiler_overlay import draw_overlay
+            draw_overlay(surface, self)
+
+    def finish(self):
+        """Save the Chrome trace if a trace_file was given"""
+        if self.trace_file:
+            self.export_chrome_trace(self.trace_file)
+
+    def chrome_trace(self):
+        """All kept frames in the Chrome trace event format"""
+        events = []
+        start = min((begin for trace in self.traces for _, begin, _ in trace), default=0.0)
+        for number, trace in enumerate(self.traces):
+            for name, begin, seconds in trace:
+                events.append({
+                    'name': name, 'ph': 'X', 'pid': 1, 'tid': 1,
+                    'ts': round((begin - start) * 1e6, 1),
+                    'dur': round(seconds * 1e6, 1),
+                    'args': {'frame': number},
+                })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, path):
+        """Write chrome_trace() to a JSON file"""
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+
+    def export_json(self, path):
+        """Write the summary and the seconds per section of every frame to a JSON file"""
+        with open(path, 'w') as f:
+            json.dump({'summary': self.summary(), 'frames': list(self.samples)}, f, indent=1)
+
+    def summary(self):
+        """Total, mean and max milliseconds per section over all frames"""
+        result = {}
+        for sample in self.samples:
+            for name, seconds in sample.items():
+                stats = result.setdefault(name, {'total_ms': 0.0, 'max_ms': 0.0})
+                stats['total_ms'] += seconds * 1000
+                stats['max_ms'] = max(stats['max_ms'], seconds * 1000)
+        for stats in result.values():
+            stats['mean_ms'] = stats['total_ms'] / len(self.samples)
+        return result
+
+
+def profiler_from_argv(argv):
+    """FrameProfiler for `--profile` (overlay) and `--trace FILE`, else NullProfiler"""
+    trace_file = None
+    if '--trace' in argv:
+        index = argv.index('--trace')
+        trace_file = argv[index + 1] if index + 1 < len(argv) else 'trace.json'
+    if trace_file is None and '--profile' not in argv:
+        return NullProfiler()
+    # Only the last minute (at 60 FPS) is kept, so memory does not grow
+    return FrameProfiler(max_samples=3600, overlay='--profile' in argv, trace_file=trace_file)
@@ -0,0 +1,338 @@
+"""
+Replay: Record a Session and Play It Back Exactly
+=================================================
+To find out why a game got slow (or did something strange) we need to see
+the same session again. The recorder saves everything that makes a
+session what it is:
+- the random seed
+- every mouse click and key press, with the frame it happened in
+- how many physics steps each frame ran (demo 5 and Flappy Bird use a
+  fixed timestep, see fixed_timestep.py)
+
+The replayer feeds this back frame by frame, so the game does exactly the
+same again: at normal speed in the window, or with --fast as fast as
+possible, without a window and without drawing (a 10-minute session takes
+seconds; add --draw to still draw every frame, e.g. to profile drawing).
+After a replay it prints frames per second and the time per loop section,
+like benchmark.py.
+
+Run it:
+    python replay.py record flappy session.log
+    python replay.py play session.log
+    python replay.py play session.log --fast --trace trace.json
+    python replay.py play session.log --fast --draw
+
+Demos: demo4, demo5, flappy, tictactoe-easy, tictactoe-hard, tictactoe-pvp.
+While recording Tic Tac Toe the computer moves without the usual pause,
+so the replay is the same however fast the computer is. Bigger boards
+(SearchPlayer) depend on the time budget and are not supported.
+
+The log file is binary: a header (magic, demo, seed, fps) and one 14-byte
+record (frame, kind, button, a, b) per click, key press or change of the
+number of physics steps.
+"""
+
+import argparse
+import json
+import os
+import random
+import runpy
+import struct
+import sys
+import time
+
+# --fast plays without a window; this must be set before pygame is imported
+if __name__ == '__main__' and '--fast' in sys.argv:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from fixed_timestep import FixedTimestep
+from inline_executor import RunNow
+from profiling import FrameProfiler, NullProfiler
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+MAGIC = b'INPUTLG1'
+HEADER = struct.Struct('<8s16sQH')     # magic, demo name, seed, fps
+RECORD = struct.Struct('<IBBii')       # frame, kind, button, a, b
+
+END = 0         # a = number of frames
+MOUSE = 1       # button, a = x, b = y
+KEY = 2         # a = key, b = modifier keys
+STEPS = 3       # a = physics steps per frame from this frame on
+
+DEMOS = ('demo4', 'demo5', 'flappy', 'tictactoe-easy', 'tictactoe-hard', 'tictactoe-pvp')
+
+# Real input is removed during a replay so it does not mix in (QUIT still works)
+INPUT_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.KEYDOWN, pygame.KEYUP)
+
+
+class InputRecorder(NullProfiler):
+    """Profiler stand-in that logs the input of every frame"""
+
+    def __init__(self, demo, seed, fps):
+        self.demo = demo
+        self.seed = seed
+        self.fps = fps
+        self.frame = -1
+        self.records = []
+        self.steps = None       # last logged number of physics steps
+        self.get_events = pygame.event.get      # demo4 replaces pygame.event.get
+
+    def next_frame(self):
+        """Log this frame's clicks and key presses, then give them back to the demo"""
+        self.frame += 1
+        for event in self.get_events():
+            self.log_event(event)
+            pygame.event.post(event)
+        return True
+
+    def log_event(self, event):
+        """Log a click or key press that the demo handles in this frame"""
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            self.records.append((self.frame, MOUSE, event.button, *event.pos))
+        elif event.type == pygame.KEYDOWN:
+            self.records.append((self.frame, KEY, 0, event.key, event.mod))
+
+    def log_steps(self, steps):
+        """Log the number of physics steps of this frame (only when it changes)"""
+        if steps != self.steps:
+            self.steps = steps
+            self.records.append((self.frame, STEPS, 0, steps, 0))
+
+    def save(self, path):
+        """Write the log file"""
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, self.demo.encode(), self.seed, self.fps))
+            for record in self.records:
+                f.write(RECORD.pack(*record))
+            f.write(RECORD.pack(self.frame + 1, END, 0, self.frame + 1, 0))
+
+
+def read_log(path):
+    """Return (demo, seed, fps, records) of a log file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, demo, seed, fps = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or (len(data) - HEADER.size) % RECORD.size:
+        raise ValueError(f"{path} is not an input log")
+    records = [RECORD.unpack_from(data, offset)
+               for offset in range(HEADER.size, len(data), RECORD.size)]
+    return demo.rstrip(b'\0').decode(), seed, fps, records
+
+
+class InputReplayer(FrameProfiler):
+    """FrameProfiler that posts the logged input at the start of each frame"""
+
+    def __init__(self, records, **profiler_options):
+        super().__init__(**profiler_options)
+        self.records = records
+        self.position = 0
+        self.steps = 0
+        self.frames = next(record[3] for record in records if record[1] == END)
+
+    def next_frame(self):
+        running = super().next_frame()
+        frame = self.frame_count - 1
+        if not running or frame >= self.frames:
+            return False
+        pygame.event.clear(INPUT_EVENTS)
+        records = self.records
+        while self.position < len(records) and records[self.position][0] == frame:
+            _, kind, button, a, b = records[self.position]
+            if kind == MOUSE:
+                pygame.event.post(pygame.event.Event(
+                    pygame.MOUSEBUTTONDOWN, pos=(a, b), button=button))
+            elif kind == KEY:
+                pygame.event.post(pygame.event.Event(
+                    pygame.KEYDOWN, key=a, mod=b, unicode='', scancode=0))
+            elif kind == STEPS:
+                self.steps = a
+            self.position += 1
+        return True
+
+
+class LoggedTimestep(FixedTimestep):
+    """Fixed timestep that logs its steps (recording) or repeats the logged ones"""
+
+    def __init__(self, log, step_hz):
+        super().__init__(step_hz)
+        self.log = log
+
+    def steps(self):
+        if isinstance(self.log, InputReplayer):
+            return self.log.steps
+        steps = super().steps()
+        self.log.log_steps(steps)
+        return steps
+
+    @property
+    def alpha(self):
+        # A replay does not know where between two steps a frame was drawn
+        if isinstance(self.log, InputReplayer):
+            return 1.0
+        return super().alpha
+
+
+def run_demo4(log, fps, draw=True):
+    """demo4 is a plain script: every call of pygame.event.get() is one frame
+
+    It has no draw switch, so draw=False only skips showing the frames
+    (pygame.display.flip); its few circles are still drawn.
+    """
+    real_get = pygame.event.get
+    real_clock = pygame.time.Clock
+    real_flip = pygame.display.flip
+
+    def get(*args, **kwargs):
+        log.next_frame()
+        if isinstance(log, InputReplayer) and log.frame_count >= log.frames:
+            # The recorded session was closed in this frame
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+        return real_get(*args, **kwargs)
+
+    class UnlimitedClock:
+        """pygame.time.Clock without the waiting (fast-forward)"""
+
+        def __init__(self):
+            self.clock = real_clock()
+
+        def tick(self, framerate=0):
+            return self.clock.tick()
+
+        def get_fps(self):
+            return self.clock.get_fps()
+
+    pygame.event.get = get
+    if fps == 0:
+        pygame.time.Clock = UnlimitedClock
+    if not draw:
+        pygame.display.flip = lambda: None
+    try:
+        runpy.run_path(os.path.join(HERE, 'demo4_lists.py'))
+    except SystemExit:
+        pass
+    finally:
+        pygame.event.get = real_get
+        pygame.time.Clock = real_clock
+        pygame.display.flip = real_flip
+    log.finish()
+
+
+def run_tictactoe(mode, log, fps, draw=True):
+    """Tic Tac Toe with the search run inline, so a replay plays the same moves
+
+    While recording, the game sleeps in pygame.event.wait() when nothing
+    happens (no busy loop); the events it wakes up with are logged for the
+    frame they are handled in. A replay posts them at the start of that
+    frame, so it must not sleep (wait_for_events=False).
+    """
+    from tictactoe_loader import load_tictactoe
+    tictactoe = load_tictactoe()
+    recording = isinstance(log, InputRecorder)
+    real_wait = pygame.event.wait
+
+    def wait(*args, **kwargs):
+        event = real_wait(*args, **kwargs)
+        log.log_event(event)
+        return event
+
+    if recording:
+        pygame.event.wait = wait
+    try:
+        while tictactoe.play_game(mode, fps=fps, ai_delay=0, profiler=log,
+                                  wait_for_events=recording, executor=RunNow(),
+                                  draw=draw) is True:
+            pass
+    finally:
+        pygame.event.wait = real_wait
+    log.finish()
+
+
+def run_demo(demo, log, fps, draw=True):
+    """Start a demo with an InputRecorder or InputReplayer as its profiler"""
+    if demo == 'demo4':
+        run_demo4(log, fps, draw)
+    elif demo == 'demo5':
+        import demo5_classes
+        demo5_classes.main(fps=fps, profiler=log,
+                           timestep=LoggedTimestep(log, demo5_classes.STEP_HZ), draw=draw)
+    elif demo == 'flappy':
+        import demo6_flappy_bird
+        demo6_flappy_bird.main(fps=fps, profiler=log,
+                               timestep=LoggedTimestep(log, demo6_flappy_bird.STEP_HZ), draw=draw)
+    elif demo.startswith('tictactoe-'):
+        run_tictactoe(demo.split('-', 1)[1], log, fps, draw)
+    else:
+        raise ValueError(f"unknown demo {demo!r}")
+
+
+def record(demo, path, seed=None, fps=60):
+    """Play a demo in the window and save its input log to path"""
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(32)
+    recorder = InputRecorder(demo, seed, fps)
+    random.seed(seed)
+    run_demo(demo, recorder, fps)
+    recorder.save(path)
+    return recorder.frame + 1
+
+
+def replay(path, fast=False, trace_file=None, draw=None):
+    """Play a log back; returns frames per second and milliseconds per section
+
+    fast: no frame limit; draw: draw the frames (default: only when not fast)
+    """
+    if draw is None:
+        draw = not fast
+    demo, seed, fps, records = read_log(path)
+    replayer = InputReplayer(records, trace_file=trace_file)
+    random.seed(seed)
+    start = time.perf_counter()
+    run_demo(demo, replayer, 0 if fast else fps, draw)
+    seconds = time.perf_counter() - start
+    frames = len(replayer.samples)
+    return {
+        'log': path,
+        'demo': demo,
+        'seed': seed,
+        'drawn': draw,
+        'frames': frames,
+        'recorded_seconds': round(frames / fps, 2) if fps else None,
+        'seconds': round(seconds, 4),
+        'fps': round(frames / seconds, 2) if seconds > 0 else None,
+        'phases_ms': {
+            phase: {stat: round(value, 4) for stat, value in stats.items()}
+            for phase, stats in replayer.summary().items()
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and replay demo sessions")
+    commands = parser.add_subparsers(dest='command', required=True)
+    record_parser = commands.add_parser('record', help="play a demo and save its input")
+    record_parser.add_argument('demo', choices=DEMOS)
+    record_parser.add_argument('log')
+    record_parser.add_argument('--seed', type=int, default=None)
+    play_parser = commands.add_parser('play', help="play a saved session again")
+    play_parser.add_argument('log')
+    play_parser.add_argument('--fast', action='store_true',
+                             help="no window, no frame limit and no drawing")
+    play_parser.add_argument('--draw', action='store_true',
+                             help="with --fast: still draw every frame")
+    play_parser.add_argument('--trace', help="save a Chrome trace of every frame")
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        frames = record(args.demo, args.log, args.seed)
+        print(f"Recorded {frames} frames of {args.demo} to {args.log}")
+    else:
+        draw = True if args.draw else None
+        print(json.dumps(replay(args.log, args.fast, args.trace, draw), indent=2))
+
+
+if __name__ == '__main__':
+    main()
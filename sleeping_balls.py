@@ -0,0 +1,156 @@
+"""
+Sleeping Balls: Skip the Balls That Do Not Move
+===============================================
+When the balls of demo 5 slow down (press F for friction) they gather in
+heaps that hardly move. Still every ball runs move() and every pair of
+neighbours is checked, every step.
+
+SleepingBalls only simulates the balls that are awake:
+- a ball that stays slower than `speed` for `frames` frames in a row may
+  fall asleep: its speed is set to 0 and it is left out of move() and of
+  the collision check
+- balls that touch each other form an island, and an island only falls
+  asleep when all of its balls are slow, so a heap never freezes while
+  one of its balls is still pushing
+- when an awake ball (faster than `speed`) runs into a sleeping one, the
+  whole island of the sleeping ball wakes up again
+
+The sleeping balls stay in a grid of their own that only changes when
+balls fall asleep or wake up, so each step costs time for the awake balls
+(and the sleeping balls right next to them), not for all balls.
+
+    world = SleepingBalls()
+    world.add(ball)
+    while running:
+        for _ in range(timestep.steps()):
+            for ball in world.awake:
+                ball.move(timestep.scale)
+            collide_with_grid(world.awake)
+            world.touch_sleeping()
+        world.end_frame()
+"""
+
+SLEEP_SPEED = 0.1       # pixels per 1/60 s
+SLEEP_FRAMES = 30       # frames in a row a ball must be that slow
+CELL_SIZE = 80          # grid of sleeping balls: as wide as the largest ball (radius 40)
+
+
+class SleepingBalls:
+    """The awake balls of demo 5, and the sleeping ones in a grid"""
+
+    def __init__(self, speed=SLEEP_SPEED, frames=SLEEP_FRAMES, cell_size=CELL_SIZE):
+        self.speed = speed
+        self.frames = frames
+        self.cell_size = cell_size
+        self.awake = []
+        self.slow_frames = {}   # awake ball -> frames in a row it was slow
+        self.island = {}        # sleeping ball -> the balls that fell asleep with it
+        self.cells = {}         # (column, row) -> sleeping balls with their center there
+
+    def __len__(self):
+        return len(self.awake) + len(self.island)
+
+    def add(self, ball):
+        """Add a new (awake) ball"""
+        self.awake.append(ball)
+        self.slow_frames[ball] = 0
+
+    def touch_sleeping(self):
+        """Wake the islands that awake balls touch, then let the balls collide"""
+        if not self.island:
+            return
+        size = self.cell_size
+        cells = self.cells
+        limit = self.speed * self.speed
+        for ball in list(self.awake):
+            if ball.speed_x * ball.speed_x + ball.speed_y * ball.speed_y < limit:
+                continue    # too slow to wake anybody (it may fall asleep itself)
+            cx = int(ball.x // size)
+            cy = int(ball.y // size)
+            for nx in (cx - 1, cx, cx + 1):
+                for ny in (cy - 1, cy, cy + 1):
+                    cell = cells.get((nx, ny))
+                    if not cell:
+                        continue
+                    for other in list(cell):
+                        # Only a ball moving into a sleeping one wakes it, not one resting against it
+                        towards = (other.x - ball.x) * ball.speed_x + (other.y - ball.y) * ball.speed_y
+                        if towards > 0 and ball.check_collision(other):
+                            if other in self.island:
+                                self.wake(other)
+                            ball.handle_collision(other)
+
+    def wake(self, ball):
+        """Wake the sleeping ball and its whole island"""
+        for member in self.island[ball]:
+            del self.island[member]
+            cell = self.cells[self._cell(member)]
+            cell.remove(member)
+            if not cell:
+                del self.cells[self._cell(member)]
+            self.awake.append(member)
+            self.slow_frames[member] = 0
+
+    def wake_all(self):
+        """Wake every ball (e.g. when sleeping is switched off)"""
+        for ball in list(self.island):
+            if ball in self.island:
+                self.wake(ball)
+
+    def end_frame(self):
+        """Count slow frames and put islands to sleep whose balls were all slow long enough"""
+        limit = self.speed * self.speed
+        ready = False
+        for ball in self.awake:
+            if ball.speed_x * ball.speed_x + ball.speed_y * ball.speed_y < limit:
+                self.slow_frames[ball] += 1
+                ready = ready or self.slow_frames[ball] >= self.frames
+            else:
+                self.slow_frames[ball] = 0
+        if not ready:
+            return
+
+        for island in self.islands():
+            if all(self.slow_frames[ball] >= self.frames for ball in island):
+                self.sleep(island)
+        self.awake = [ball for ball in self.awake if ball not in self.island]
+
+    def islands(self):
+        """Groups of awake balls that touch each other (union-find)"""
+        parent = {ball: ball for ball in self.awake}
+
+        def root(ball):
+            while parent[ball] is not ball:
+                parent[ball] = parent[parent[ball]]
+                ball = parent[ball]
+            return ball
+
+        size = self.cell_size
+        grid = {}
+        for ball in self.awake:
+            key = (int(ball.x // size), int(ball.y // size))
+            grid.setdefault(key, []).append(ball)
+        for (cx, cy), cell in grid.items():
+            for nx in (cx - 1, cx, cx + 1):
+                for ny in (cy - 1, cy, cy + 1):
+                    for other in grid.get((nx, ny), ()):
+                        for ball in cell:
+                            if ball is not other and ball.check_collision(other):
+                                parent[root(ball)] = root(other)
+
+        groups = {}
+        for ball in self.awake:
+            groups.setdefault(root(ball), []).append(ball)
+        return groups.values()
+
+    def sleep(self, island):
+        """Stop the balls of an island and move them into the grid of sleeping balls"""
+        for ball in island:
+            ball.speed_x = ball.speed_y = 0
+            ball.prev_x, ball.prev_y = ball.x, ball.y
+            self.island[ball] = island
+            del self.slow_frames[ball]
+            self.cells.setdefault(self._cell(ball), []).append(ball)
+
+    def _cell(self, ball):
+        return int(ball.x // self.cell_size), int(ball.y // self.cell_size)
@@ -0,0 +1,226 @@
+"""
+Swept Collisions: Balls That Never Pass Through Each Other
+==========================================================
+Ball.move() jumps a ball by its whole speed in one step, and
+Ball.handle_collision() only notices a contact after the balls already
+overlap. Fast balls can therefore jump through each other (tunneling), and
+in dense heaps the push that separates two balls makes them overlap with a
+third one, which makes them jitter.
+
+SweptCollider moves the balls itself and handles every contact at the
+moment it happens (time of impact) inside the step:
+1. compute for each pair of nearby balls when they will touch, and for each
+   ball when it will reach a wall
+2. take the earliest of these events from a priority queue (heapq), move
+   the two balls to that moment and exchange their velocities with the
+   Ball.handle_collision rule
+3. compute the new events of these two balls, and repeat until the step ends
+
+Balls that touch this way never overlap, so they need no push apart. A
+frame may handle at most `max_events` contacts; after that the balls just
+move to the end of the step, and the rest of the frame moves them and
+pushes apart whatever overlaps like before (Ball.move and
+Ball.handle_collision). A huge heap of balls then
+makes the frame less exact, but not slow.
+
+    collider = SweptCollider(max_events=1000)
+    while running:
+        collider.new_frame()
+        for _ in range(timestep.steps()):
+            collider.step(balls, timestep.scale)    # instead of move + collide
+"""
+
+import heapq
+import itertools
+import math
+
+WIDTH = 800
+HEIGHT = 600
+
+X_WALL = -1     # "other ball" of an event with the left or right wall
+Y_WALL = -2     # ... with the top or bottom wall
+
+
+class SweptCollider:
+    """Continuous collision detection for a list of demo5_classes.Ball"""
+
+    def __init__(self, max_events=1000, width=WIDTH, height=HEIGHT):
+        self.max_events = max_events    # contacts handled per frame
+        self.width = width
+        self.height = height
+        self.events = 0                 # contacts handled in this frame
+        self.fallback_pairs = 0         # overlapping pairs pushed apart in this frame
+        self._ids = itertools.count()   # tie breaker for events at the same time
+
+    def new_frame(self):
+        """Start counting events for a new frame"""
+        self.events = 0
+        self.fallback_pairs = 0
+
+    def candidate_pairs(self, balls, dt):
+        """Pairs (i, j) of balls that may touch during a step of length dt
+
+        Like demo5_classes.SpatialGrid, but every ball is as big as the area
+        it can reach in the step: its radius plus twice its way (velocities
+        change at contacts).
+        """
+        sizes = [ball.radius + 2 * math.hypot(ball.speed_x, ball.speed_y) * dt for ball in balls]
+        cell_size = 2 * max(sizes)
+        cells = {}
+        for i, ball in enumerate(balls):
+            key = (int(ball.x // cell_size), int(ball.y // cell_size))
+            if key in cells:
+                cells[key].append(i)
+            else:
+                cells[key] = [i]
+
+        pairs = []
+        for (cx, cy), cell in cells.items():
+            # This cell with itself and with half of its neighbours (each pair once)
+            for nx, ny in ((cx, cy), (cx + 1, cy), (cx - 1, cy + 1), (cx, cy + 1), (cx + 1, cy + 1)):
+                neighbour = cells.get((nx, ny))
+                if not neighbour:
+                    continue
+                same = neighbour is cell
+                for a, i in enumerate(cell):
+                    ball, size = balls[i], sizes[i]
+                    for j in (cell[a + 1:] if same else neighbour):
+                        other = balls[j]
+                        near = size + sizes[j]
+                        if (ball.x - other.x) ** 2 + (ball.y - other.y) ** 2 <= near * near:
+                            pairs.append((i, j))
+        return pairs
+
+    def step(self, balls, dt=1.0):
+        """Move all balls by one step (dt 1.0 = 1/60 s), handling every contact in time"""
+        if not balls:
+            return
+        pairs = self.candidate_pairs(balls, dt)
+        if self.events >= self.max_events:
+            # Out of budget for this frame: move and push apart like before
+            for ball in balls:
+                ball.move(dt)
+            self._push_apart(balls, pairs)
+            return
+        neighbours = [[] for _ in balls]
+        for i, j in pairs:
+            neighbours[i].append(j)
+            neighbours[j].append(i)
+
+        for ball in balls:
+            ball.prev_x = ball.x
+            ball.prev_y = ball.y
+        # Balls that already overlap (just added, or left over when the budget
+        # ran out) are pushed apart the old way first
+        self._push_apart(balls, pairs)
+        # Ball i is at (x, y) at time clock[i] of the step (0 ... dt).
+        # version[i] changes at each of its contacts, making its older events invalid.
+        clock = [0.0] * len(balls)
+        version = [0] * len(balls)
+        queue = []
+        for i in range(len(balls)):
+            self._push_wall_events(queue, balls, clock, version, i, dt)
+        for i, j in pairs:
+            self._push_pair_event(queue, balls, clock, version, i, j, dt)
+
+        while queue:
+            time, _, i, j, version_i, version_j = heapq.heappop(queue)
+            if version[i] != version_i or (j >= 0 and version[j] != version_j):
+                continue
+            if self.events >= self.max_events:
+                break
+            self.events += 1
+            self._advance(balls[i], clock, i, time)
+            ball = balls[i]
+            if j == X_WALL:
+                ball.speed_x *= -1
+            elif j == Y_WALL:
+                ball.speed_y *= -1
+            else:
+                self._advance(balls[j], clock, j, time)
+                bounce(ball, balls[j])
+            for k in (i, j) if j >= 0 else (i,):
+                version[k] += 1
+                self._push_wall_events(queue, balls, clock, version, k, dt)
+                for other in neighbours[k]:
+                    self._push_pair_event(queue, balls, clock, version, k, other, dt)
+
+        for i, ball in enumerate(balls):
+            self._advance(ball, clock, i, dt)
+
+    def _push_apart(self, balls, pairs):
+        """Ball.handle_collision for every overlapping pair"""
+        for i, j in pairs:
+            ball, other = balls[i], balls[j]
+            if ball.check_collision(other):
+                ball.handle_collision(other)
+                self.fallback_pairs += 1
+
+    @staticmethod
+    def _advance(ball, clock, i, time):
+        """Move ball i in a straight line to the given time of the step"""
+        passed = time - clock[i]
+        ball.x += ball.speed_x * passed
+        ball.y += ball.speed_y * passed
+        clock[i] = time
+
+    def _push_wall_events(self, queue, balls, clock, version, i, dt):
+        """Queue the moments ball i reaches a wall (if still in this step)"""
+        ball = balls[i]
+        for position, speed, size, wall in ((ball.x, ball.speed_x, self.width, X_WALL),
+                                            (ball.y, ball.speed_y, self.height, Y_WALL)):
+            if speed < 0:
+                time = clock[i] + max(0.0, (ball.radius - position) / speed)
+            elif speed > 0:
+                time = clock[i] + max(0.0, (size - ball.radius - position) / speed)
+            else:
+                continue
+            if time <= dt:
+                heapq.heappush(queue, (time, next(self._ids), i, wall, version[i], 0))
+
+    def _push_pair_event(self, queue, balls, clock, version, i, j, dt):
+        """Queue the moment balls i and j touch (if they approach each other in this step)"""
+        ball, other = balls[i], balls[j]
+        clock_i, clock_j = clock[i], clock[j]
+        start = clock_i if clock_i > clock_j else clock_j
+        # Relative position and velocity of j seen from i, at time start
+        dvx = other.speed_x - ball.speed_x
+        dvy = other.speed_y - ball.speed_y
+        dx = other.x - ball.x + dvx * start - other.speed_x * clock_j + ball.speed_x * clock_i
+        dy = other.y - ball.y + dvy * start - other.speed_y * clock_j + ball.speed_y * clock_i
+        closing = dx * dvx + dy * dvy
+        if closing >= -1e-12:
+            return      # moving apart (or side by side)
+        touch = ball.radius + other.radius
+        gap = dx * dx + dy * dy - touch * touch
+        if gap < -touch:
+            return      # more than about half a pixel deep: pushed apart next step
+        if gap <= 0:
+            time = start    # just touching (rounding) and approaching: bounce now
+        else:
+            # Solve |d + dv t| = touch for the first t
+            speed2 = dvx * dvx + dvy * dvy
+            discriminant = closing * closing - speed2 * gap
+            if discriminant < 0:
+                return      # they pass each other
+            time = start + gap / (-closing + math.sqrt(discriminant))
+        if time <= dt:
+            heapq.heappush(queue, (time, next(self._ids), i, j, version[i], version[j]))
+
+
+def bounce(ball, other):
+    """Exchange velocities along the line between the centers (Ball.handle_collision without the push)"""
+    dx = other.x - ball.x
+    dy = other.y - ball.y
+    distance = math.hypot(dx, dy)
+    if distance == 0:
+        return
+    dx /= distance
+    dy /= distance
+    dot = (ball.speed_x - other.speed_x) * dx + (ball.speed_y - other.speed_y) * dy
+    if dot > 0:
+        ball.speed_x -= dot * dx
+        ball.speed_y -= dot * dy
+        other.speed_x += dot * dx
+        other.speed_y += dot * dy
+
@@ -0,0 +1,80 @@
+"""
+Text Cache: Render Each Text Only Once
+======================================
+Creating a pygame Font and rendering text are slow compared to blitting a
+finished picture. Most text in the demos ("Click to change colors!",
+button labels, ...) never changes, so it only needs to be rendered once.
+
+- get_font(size) creates each (name, size) font once
+- render_text(text, size, color) keeps the most recently used text
+  pictures and reuses them; only new texts are rendered
+- cache_stats() shows how often the caches helped (hits) or not (misses)
+  (counters keep running across pygame.quit(); reset_stats() zeroes them)
+
+The returned surfaces are shared: blit them, but do not draw on them.
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+MAX_SURFACES = 256      # rendered texts kept (least recently used are dropped)
+
+_fonts = {}
+_surfaces = OrderedDict()
+_stats = {'font_hits': 0, 'font_misses': 0, 'text_hits': 0, 'text_misses': 0}
+
+
+def get_font(size, name=None):
+    """Return the font with this name (None = pygame default) and size"""
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        _stats['font_misses'] += 1
+        font = _fonts[key] = pygame.font.Font(name, size)
+    else:
+        _stats['font_hits'] += 1
+    return font
+
+
+def render_text(text, size, color, antialias=True, name=None):
+    """Return a surface with text, rendered only if it is not cached yet"""
+    key = (text, size, tuple(color), antialias, name)
+    surface = _surfaces.get(key)
+    if surface is not None:
+        _stats['text_hits'] += 1
+        _surfaces.move_to_end(key)
+        return surface
+
+    _stats['text_misses'] += 1
+    surface = _surfaces[key] = get_font(size, name).render(text, antialias, color)
+    if len(_surfaces) > MAX_SURFACES:
+        _surfaces.popitem(last=False)
+    return surface
+
+
+def cache_stats():
+    """Hit/miss counters plus the number of cached fonts and texts"""
+    return dict(_stats, fonts=len(_fonts), surfaces=len(_surfaces))
+
+
+def clear_cache():
+    """Forget all cached fonts and texts"""
+    _fonts.clear()
+    _surfaces.clear()
+
+
+def reset_stats():
+    """Set all hit/miss counters back to 0"""
+    for key in _stats:
+        _stats[key] = 0
+
+
+def _on_quit():
+    clear_cache()
+    # pygame forgets its quit functions after calling them, so register again
+    pygame.register_quit(_on_quit)
+
+
+# Fonts stop working after pygame.quit(), so start over next time
+pygame.register_quit(_on_quit)
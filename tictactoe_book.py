@@ -0,0 +1,157 @@
+"""
+Tic Tac Toe Book: Every Position Solved in Advance
+==================================================
+Tic tac toe has only 5,478 legal positions, so instead of searching during
+the game we can solve all of them once and store the answers in a file.
+
+Each board is numbered in base 3 (empty = 0, X = 1, O = 2, square 0 is the
+lowest digit), so a position is found in the file with one multiplication.
+Every record holds:
+- the value for the player to move: (empty squares + 1) for a win,
+  minus that for a loss, 0 for a draw (same scores as MinimaxPlayer)
+- a 9-bit mask of all best moves
+
+X always moves first. Unreachable boards have the value -128.
+
+Run it:
+    python tictactoe_book.py            # (re)build tictactoe_book.bin
+    python tictactoe_book.py --verify   # check the file matches a fresh build
+
+The build is deterministic, so the file is byte-identical on every machine.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tictactoe_book.bin')
+
+MAGIC = b'TTTBOOK1'
+HEADER = struct.Struct('<8sI')    # magic, number of records
+RECORD = struct.Struct('<bH')     # value, best move mask
+UNREACHABLE = -128
+POSITIONS = 3 ** 9
+
+WIN_LINES = ((0, 1, 2), (3, 4, 5), (6, 7, 8),
+             (0, 3, 6), (1, 4, 7), (2, 5, 8),
+             (0, 4, 8), (2, 4, 6))
+POWERS = tuple(3 ** i for i in range(9))
+
+# Squares as in TicTacToe-pygame.py (' ', 'X', 'O') or TicTacToe.py (0, 1, 2)
+CELL_DIGITS = {' ': 0, 'X': 1, 'O': 2, 0: 0, 1: 1, 2: 2}
+
+
+def board_index(board):
+    """Number of a board (9 squares, row by row) in the book"""
+    index = 0
+    for square, cell in enumerate(board):
+        index += CELL_DIGITS[cell] * POWERS[square]
+    return index
+
+
+def _has_line(digits, player):
+    return any(digits[a] == player and digits[b] == player and digits[c] == player
+               for a, b, c in WIN_LINES)
+
+
+def build_book():
+    """Solve every reachable position and return the book file contents"""
+    records = [(UNREACHABLE, 0)] * POSITIONS
+    digits = [0] * 9
+
+    def solve(index, player, empty):
+        """Value for player (1 = X, 2 = O) to move; fills in records"""
+        if records[index][0] != UNREACHABLE:
+            return records[index][0]
+
+        other = 3 - player
+        if _has_line(digits, other):
+            value, best_moves = -(empty + 1), 0
+        elif empty == 0:
+            value, best_moves = 0, 0
+        else:
+            value, best_moves = None, 0
+            for square in range(9):
+                if digits[square]:
+                    continue
+                digits[square] = player
+                score = -solve(index + player * POWERS[square], other, empty - 1)
+                digits[square] = 0
+                if value is None or score > value:
+                    value, best_moves = score, 1 << square
+                elif score == value:
+                    best_moves |= 1 << square
+
+        records[index] = (value, best_moves)
+        return value
+
+    solve(0, 1, 9)
+    parts = [HEADER.pack(MAGIC, POSITIONS)]
+    parts.extend(RECORD.pack(value, best_moves) for value, best_moves in records)
+    return b''.join(parts)
+
+
+def write_book(path=BOOK_FILE):
+    """Build the book and save it to path"""
+    data = build_book()
+    with open(path, 'wb') as f:
+        f.write(data)
+    return data
+
+
+_open_books = {}
+
+
+def open_book(path=BOOK_FILE):
+    """Memory-map the book file (built first if it does not exist yet)"""
+    if path not in _open_books:
+        if not os.path.exists(path):
+            write_book(path)
+        with open(path, 'rb') as f:
+            book = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = HEADER.unpack_from(book, 0)
+        if magic != MAGIC or count != POSITIONS or len(book) != HEADER.size + count * RECORD.size:
+            raise ValueError(f"{path} is not a tic tac toe book file")
+        _open_books[path] = book
+    return _open_books[path]
+
+
+def lookup(board, path=BOOK_FILE):
+    """Return (value for the player to move, best move mask) for a board"""
+    book = open_book(path)
+    return RECORD.unpack_from(book, HEADER.size + board_index(board) * RECORD.size)
+
+
+class BookPlayer:
+    """Perfect player that looks up its move in the book instead of searching"""
+
+    def __init__(self, letter, path=BOOK_FILE):
+        self.letter = letter
+        self.path = path
+        open_book(path)
+
+    def get_move(self, game):
+        """Get the first best move from the book"""
+        value, best_moves = lookup(game.board, self.path)
+        if value == UNREACHABLE or best_moves == 0:
+            raise ValueError("position is not in the book")
+        return (best_moves & -best_moves).bit_length() - 1
+
+
+def main():
+    if '--verify' in sys.argv:
+        with open(BOOK_FILE, 'rb') as f:
+            ok = f.read() == build_book()
+        print(f"{BOOK_FILE}: {'OK' if ok else 'DIFFERENT from a fresh build'}")
+        sys.exit(0 if ok else 1)
+    data = write_book()
+    reachable = sum(1 for index in range(POSITIONS)
+                    if RECORD.unpack_from(data, HEADER.size + index * RECORD.size)[0] != UNREACHABLE)
+    print(f"Wrote {BOOK_FILE}: {reachable} positions, {len(data)} bytes, "
+          f"sha256 {hashlib.sha256(data).hexdigest()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+"""
+Loading TicTacToe-pygame.py from Other Scripts
+==============================================
+The file name TicTacToe-pygame.py contains a "-", so `import` cannot load
+it. load_tictactoe() imports it under the name tictactoe_pygame instead.
+
+Importing it opens the game window (like running it does), but does not
+start the game.
+"""
+
+import importlib.util
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_tictactoe():
+    """Import TicTacToe-pygame.py (its file name is not a valid module name)"""
+    if 'tictactoe_pygame' in sys.modules:
+        return sys.modules['tictactoe_pygame']
+    spec = importlib.util.spec_from_file_location(
+        'tictactoe_pygame', os.path.join(HERE, 'TicTacToe-pygame.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['tictactoe_pygame'] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,196 @@
+"""
+Tournament: Let Two Tic Tac Toe Players Play Many Games
+=======================================================
+Is the new computer player really better? Play a few thousand games and
+count. The games run without a window, spread over all CPU cores
+(ProcessPoolExecutor), and the players take turns starting.
+
+Run it:
+    python tournament.py minimax random                   # 1000 games
+    python tournament.py book minimax --games 5000 --workers 4 --seed 1
+    python tournament.py search random --size 5 --k 4
+    python tournament.py mcts minimax --games 200
+
+Players: random (ComputerPlayer), minimax (MinimaxPlayer), book
+(tictactoe_book.BookPlayer), vector (vector_minimax.VectorMinimaxPlayer,
+boards up to 4×4), mcts (mcts_player.MCTSPlayer) and search
+(nk_engine.SearchPlayer). From
+Python, play_match() also takes any function letter -> player object that
+can be pickled (e.g. a class defined in a module).
+
+The result (JSON) has wins/draws/losses of the first player, the average
+and 99th percentile time per move of each player, and games per second.
+Game number g always uses the random seed "seed-g", so a match gives the same
+result with any number of workers.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Loading TicTacToe-pygame.py opens its window: keep it invisible.
+# Must be set before pygame is imported (also in the worker processes).
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from json_output import write_json
+from tictactoe_loader import load_tictactoe
+
+SEARCH_TIME = 0.05      # seconds per move for the "search" player
+MCTS_PLAYOUTS = 2000    # playouts per move for the "mcts" player (same games on any machine)
+
+
+def make_player(spec, letter):
+    """Create a player from a name (see PLAYERS) or a function letter -> player"""
+    if callable(spec):
+        return spec(letter)
+    if spec == 'random':
+        return load_tictactoe().ComputerPlayer(letter)
+    if spec == 'minimax':
+        return load_tictactoe().MinimaxPlayer(letter)
+    if spec == 'book':
+        from tictactoe_book import BookPlayer
+        return BookPlayer(letter)
+    if spec == 'vector':
+        from vector_minimax import VectorMinimaxPlayer
+        return VectorMinimaxPlayer(letter)
+    if spec == 'mcts':
+        from mcts_player import MCTSPlayer
+        return MCTSPlayer(letter, time_budget=None, iterations=MCTS_PLAYOUTS)
+    if spec == 'search':
+        from nk_engine import SearchPlayer
+        return SearchPlayer(letter, time_budget=SEARCH_TIME)
+    raise ValueError(f"unknown player {spec!r}")
+
+
+PLAYERS = ('random', 'minimax', 'book', 'vector', 'mcts', 'search')
+
+
+def new_board(size, k):
+    """Empty board: the normal TicTacToe for 3×3, an NKGame otherwise"""
+    if size == 3 and k == 3:
+        return load_tictactoe().TicTacToe()
+    from nk_engine import NKGame
+    return NKGame(size, k)
+
+
+def play_one(player_x, player_o, game, latencies):
+    """Play one game; returns 'X', 'O' or None (draw). Adds move times to latencies.
+
+    A player that returns an occupied or invalid square raises ValueError.
+    """
+    players = {'X': player_x, 'O': player_o}
+    letter = 'X'
+    while game.empty_squares():
+        start = time.perf_counter()
+        square = players[letter].get_move(game)
+        latencies[letter].append(time.perf_counter() - start)
+        if not (isinstance(square, int) and 0 <= square < len(game.board)
+                and game.make_move(square, letter)):
+            raise ValueError(f"illegal move {square!r} by {letter} "
+                             f"({type(players[letter]).__name__}) on {''.join(game.board)!r}")
+        if game.current_winner:
+            return letter
+        letter = 'O' if letter == 'X' else 'X'
+    return None
+
+
+def play_games(spec_a, spec_b, first_game, count, seed, size=3, k=3):
+    """Play games first_game ... first_game + count - 1 (runs in a worker process).
+
+    Even games: A plays X (starts); odd games: B plays X.
+    Returns ({'wins', 'draws', 'losses'} for A, A's move times, B's move times).
+    """
+    import random
+
+    result = {'wins': 0, 'draws': 0, 'losses': 0}
+    times_a, times_b = [], []
+    for g in range(first_game, first_game + count):
+        random.seed(f"{seed}-{g}")
+        a_is_x = g % 2 == 0
+        a = make_player(spec_a, 'X' if a_is_x else 'O')
+        b = make_player(spec_b, 'O' if a_is_x else 'X')
+        latencies = {'X': [], 'O': []}
+        if a_is_x:
+            winner = play_one(a, b, new_board(size, k), latencies)
+        else:
+            winner = play_one(b, a, new_board(size, k), latencies)
+        if winner is None:
+            result['draws'] += 1
+        elif winner == a.letter:
+            result['wins'] += 1
+        else:
+            result['losses'] += 1
+        times_a.extend(latencies[a.letter])
+        times_b.extend(latencies[b.letter])
+    return result, times_a, times_b
+
+
+def latency_stats(seconds):
+    """Average and 99th percentile move time in milliseconds"""
+    if not seconds:
+        return {'moves': 0, 'mean_ms': None, 'p99_ms': None}
+    ordered = sorted(seconds)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return {
+        'moves': len(ordered),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 4),
+        'p99_ms': round(p99 * 1000, 4),
+    }
+
+
+def play_match(player_a, player_b, games=1000, workers=None, seed=0, size=3, k=3):
+    """Play games between two players on all cores and return the statistics"""
+    workers = workers or os.cpu_count() or 1
+    # A few batches per worker, so a slow batch does not leave cores idle
+    batch = max(1, games // (workers * 4))
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = [pool.submit(play_games, player_a, player_b, first, min(batch, games - first),
+                            seed, size, k)
+                for first in range(0, games, batch)]
+        results = [job.result() for job in jobs]
+    seconds = time.perf_counter() - start
+
+    totals = {'wins': 0, 'draws': 0, 'losses': 0}
+    times_a, times_b = [], []
+    for counts, a, b in results:
+        for name in totals:
+            totals[name] += counts[name]
+        times_a.extend(a)
+        times_b.extend(b)
+    return {
+        'player_a': getattr(player_a, '__name__', player_a),
+        'player_b': getattr(player_b, '__name__', player_b),
+        'board': f"{size}x{size}, {k} in a row",
+        'games': games,
+        'seed': seed,
+        'workers': workers,
+        'a_results': totals,
+        'a_latency': latency_stats(times_a),
+        'b_latency': latency_stats(times_b),
+        'seconds': round(seconds, 4),
+        'games_per_sec': round(games / seconds, 2) if seconds > 0 else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play many tic tac toe games between two players")
+    parser.add_argument('player_a', choices=PLAYERS)
+    parser.add_argument('player_b', choices=PLAYERS)
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--size', type=int, default=3, help="board size (other than 3: NKGame)")
+    parser.add_argument('--k', type=int, default=None, help="marks in a row to win")
+    parser.add_argument('--output', help="write JSON to this file instead of stdout")
+    args = parser.parse_args(argv)
+    k = args.k or min(args.size, 5)
+    write_json(play_match(args.player_a, args.player_b, args.games, args.workers,
+                          args.seed, args.size, k), args.output)
+
+
+if __name__ == '__main__':
+    main()
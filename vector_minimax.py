@@ -0,0 +1,216 @@
+"""
+Vector Minimax: Solve a Whole Game Ply by Ply with NumPy
+========================================================
+MinimaxPlayer (TicTacToe-pygame.py) and max_value/min_value (TicTacToe.py)
+visit the game tree one position at a time in Python. solve() looks at
+all positions with the same number of marks at once, as one NumPy array:
+
+1. forward: starting from the empty board, make every possible move in
+   every position of a ply, and keep each resulting board once
+   (sorted, repeated boards removed) as the next ply
+2. a position is over when the player who just moved has a line: one
+   masked comparison of all boards against all win lines
+   ((bits & line) == line), or when the board is full
+3. backward: from the last ply to the first, the value of a position is
+   the best of minus the values of its children (negamax), looked up in
+   the sorted boards of the next ply with np.searchsorted
+
+A board is one 64-bit number: the squares of X in the low bits, the
+squares of O above them, so boards up to 5×5 fit (4×4 is the largest that
+can be solved in memory). Values are the same as in MinimaxPlayer and
+tictactoe_book.py: for the player to move, (empty squares + 1) for a win,
+minus that for a loss, 0 for a draw.
+
+Run it:
+    python vector_minimax.py            # solve 3×3
+    python vector_minimax.py 4 3        # 4×4 with 3 in a row
+    python vector_minimax.py --verify   # compare 3×3 with tictactoe_book.py
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from nk_engine import board_geometry
+
+UNKNOWN = -128      # value of a position that is not reachable
+
+
+class Solution:
+    """Every reachable position of a size×size, k-in-a-row game and its value"""
+
+    def __init__(self, size, k, plies, seconds):
+        self.size = size
+        self.k = k
+        self.plies = plies          # per number of marks: (sorted boards, values)
+        self.seconds = seconds
+
+    @property
+    def positions(self):
+        return sum(len(boards) for boards, _ in self.plies)
+
+    def key(self, board):
+        """Number of a board given as a list of ' ', 'X', 'O' (row by row)"""
+        squares = self.size * self.size
+        key = 0
+        for square, cell in enumerate(board):
+            if cell == 'X':
+                key |= 1 << square
+            elif cell == 'O':
+                key |= 1 << (squares + square)
+        return key
+
+    def value(self, board):
+        """Value of a board for the player to move (UNKNOWN if not reachable)"""
+        ply = sum(cell != ' ' for cell in board)
+        boards, values = self.plies[ply]
+        key = self.key(board)
+        position = np.searchsorted(boards, key)
+        if position == len(boards) or boards[position] != key:
+            return UNKNOWN
+        return int(values[position])
+
+    def best_moves(self, board):
+        """All squares whose move keeps the value of the board"""
+        letter = 'X' if sum(cell != ' ' for cell in board) % 2 == 0 else 'O'
+        scores = {}
+        board = list(board)
+        for square, cell in enumerate(board):
+            if cell == ' ':
+                board[square] = letter
+                scores[square] = -self.value(board)
+                board[square] = ' '
+        best = max(scores.values(), default=None)
+        return [square for square, score in scores.items() if score == best]
+
+
+def _line_masks(size, k):
+    windows, _ = board_geometry(size, k)
+    return np.array([sum(1 << square for square in window) for window in windows], dtype=np.int64)
+
+
+def _has_line(bits, lines):
+    """For each board (bits of one player): does it contain a complete line?"""
+    return ((bits[:, None] & lines[None, :]) == lines[None, :]).any(axis=1)
+
+
+def _sorted_unique(boards):
+    """Sort and drop repeated boards (np.unique, but without hashing: faster here)"""
+    boards.sort()
+    keep = np.empty(len(boards), dtype=bool)
+    keep[:1] = True
+    np.not_equal(boards[1:], boards[:-1], out=keep[1:])
+    return boards[keep]
+
+
+def solve(size=3, k=3):
+    """Solve the game from the empty board; returns a Solution"""
+    squares = size * size
+    if 2 * squares > 63:
+        raise ValueError("boards up to 5×5 only (two 25-bit halves in 64 bits)")
+    full = (1 << squares) - 1
+    lines = _line_masks(size, k)
+    start = time.perf_counter()
+
+    # Forward: the boards of every ply, and which of them end the game
+    plies = [np.zeros(1, dtype=np.int64)]
+    finished = [np.zeros(1, dtype=bool)]
+    for ply in range(squares):
+        boards = plies[-1][~finished[-1]]
+        shift = 0 if ply % 2 == 0 else squares       # X moves on even plies
+        free = ~(boards | (boards >> squares)) & full
+        children = [boards[(free >> square) & 1 == 1] + (1 << (shift + square))
+                    for square in range(squares)]
+        boards = _sorted_unique(np.concatenate(children))
+        if len(boards) == 0:
+            break
+        mover = (boards >> shift) & full
+        finished.append(_has_line(mover, lines) | (ply + 1 == squares))
+        plies.append(boards)
+
+    # Backward: value for the player to move, from the last ply to the first
+    values = [None] * len(plies)
+    for ply in range(len(plies) - 1, -1, -1):
+        boards = plies[ply]
+        empty = squares - ply
+        value = np.full(len(boards), UNKNOWN, dtype=np.int8)
+        # Finished: the player who just moved has won, or the board is full
+        if ply > 0:
+            shift = 0 if ply % 2 == 1 else squares
+            won = _has_line((boards >> shift) & full, lines)
+            value[won] = -(empty + 1)
+            value[finished[ply] & ~won] = 0
+        playing = ~finished[ply]
+        if playing.any():
+            shift = 0 if ply % 2 == 0 else squares
+            open_boards = boards[playing]
+            free = ~(open_boards | (open_boards >> squares)) & full
+            best = np.full(len(open_boards), -127, dtype=np.int8)
+            next_boards, next_values = plies[ply + 1], values[ply + 1]
+            for square in range(squares):
+                legal = (free >> square) & 1 == 1
+                children = open_boards[legal] + (1 << (shift + square))
+                scores = -next_values[np.searchsorted(next_boards, children)]
+                best[legal] = np.maximum(best[legal], scores)
+            value[playing] = best
+        values[ply] = value
+
+    seconds = time.perf_counter() - start
+    return Solution(size, k, list(zip(plies, values)), seconds)
+
+
+_solutions = {}
+
+
+def solution(size=3, k=3):
+    """Solve once per process and keep the result"""
+    if (size, k) not in _solutions:
+        _solutions[size, k] = solve(size, k)
+    return _solutions[size, k]
+
+
+class VectorMinimaxPlayer:
+    """Perfect player that plays from a solve() of the whole game"""
+
+    def __init__(self, letter):
+        self.letter = letter
+
+    def get_move(self, game):
+        """First best move (the solution is computed on the first call)"""
+        size = getattr(game, 'size', 3)
+        k = getattr(game, 'k', 3)
+        return solution(size, k).best_moves(game.board)[0]
+
+
+def verify():
+    """Compare every 3×3 value with tictactoe_book.py; returns True if all equal"""
+    import itertools
+    import tictactoe_book
+
+    result = solve(3, 3)
+    checked = 0
+    for cells in itertools.product(' XO', repeat=9):
+        value, _ = tictactoe_book.lookup(cells)
+        if value != result.value(cells):
+            print(f"{''.join(cells)!r}: book {value}, vector minimax {result.value(cells)}")
+            return False
+        checked += value != tictactoe_book.UNREACHABLE
+    print(f"{checked} positions equal to the book (solved in {result.seconds * 1000:.1f} ms)")
+    return checked == result.positions
+
+
+def main():
+    if '--verify' in sys.argv:
+        sys.exit(0 if verify() else 1)
+    numbers = [int(arg) for arg in sys.argv[1:] if arg.isdigit()]
+    size = numbers[0] if numbers else 3
+    k = numbers[1] if len(numbers) > 1 else min(size, 5)
+    result = solve(size, k)
+    print(f"{size}×{size}, {k} in a row: value {result.value([' '] * size * size)} for X, "
+          f"{result.positions} positions in {result.seconds:.3f} s "
+          f"({result.positions / result.seconds:,.0f} positions/s)")
+
+
+if __name__ == '__main__':
+    main()